@@ -0,0 +1,92 @@
+# Concurrent-interaction latency with blocking pymongo calls on the event loop
+# ("before") versus the same calls routed through storage.AsyncMongo ("after").
+#
+#   python benchmarks/bench_event_loop.py --interactions 200 --latency 0.02
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from storage import AsyncMongo  # noqa: E402
+from fakemongo import FakeClient  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+# Same shape as a typical handler: config lookup, a write, then log_action's config lookup
+def blocking_handler(client, guild_id):
+    db = client['bench']
+    db['config'].find_one({'guild_id': guild_id})
+    db['events'].insert_one({'guild_id': guild_id, 'title': 'a vs b'})
+    db['config'].find_one({'guild_id': guild_id})
+
+
+async def async_handler(mongo, guild_id):
+    db = mongo['bench']
+    await db['config'].find_one({'guild_id': guild_id})
+    await db['events'].insert_one({'guild_id': guild_id, 'title': 'a vs b'})
+    await db['config'].find_one({'guild_id': guild_id})
+
+
+async def heartbeat(interval, lags, stop):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def run(mode, interactions, latency, workers):
+    client = FakeClient(latency=latency)
+    mongo = AsyncMongo(client, max_workers=workers)
+    latencies, lags = [], []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(0.05, lags, stop))
+
+    async def interaction(guild_id):
+        started = time.perf_counter()
+        await asyncio.sleep(0)
+        if mode == 'before':
+            blocking_handler(client, guild_id)
+        else:
+            await async_handler(mongo, guild_id)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(interaction(i % 20) for i in range(interactions)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await beat
+    mongo.executor.shutdown()
+    return {
+        'mode': mode,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'wall_s': elapsed,
+        'max_heartbeat_lag_ms': max(lags, default=0) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--interactions', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.02, help='simulated Mongo round trip in seconds')
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+
+    for mode in ('before', 'after'):
+        result = asyncio.run(run(mode, args.interactions, args.latency, args.workers))
+        print(
+            f"{result['mode']:>6}: p50={result['p50_ms']:.1f}ms p99={result['p99_ms']:.1f}ms "
+            f"wall={result['wall_s']:.2f}s max heartbeat lag={result['max_heartbeat_lag_ms']:.1f}ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+# Offline load test for the slash command handlers. Each handler runs against
+# fake Interaction/Guild/Channel objects (fakediscord.py) and the in-memory
+# Mongo stand-in (fakemongo.py), and the report gives p50/p99 latency, Mongo
+# round trips per call and bytes sent to Discord per call.
+#
+#   python benchmarks/bench_handlers.py --events 100,10000 --concurrency 1,16
+#   python benchmarks/bench_handlers.py --compare benchmarks/results/<earlier>.json
+#   python benchmarks/bench_handlers.py --read-profile   # route READ_COMMANDS to secondaries
+#
+# Every run is written to benchmarks/results/ as JSON. --compare exits non-zero
+# when p99 latency or round trips regress against an earlier run.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pymongo import ReadPreference
+from pymongo.read_concern import ReadConcern
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import bot  # noqa: E402
+from indexes import INDEXES  # noqa: E402
+from storage import AsyncMongo  # noqa: E402
+from tenants import Tenants  # noqa: E402
+from fakemongo import FakeClient  # noqa: E402
+from fakediscord import FakeChannel, FakeGuild, FakeMessage, FakeInteraction, FakeRole, FakeUser, Recorder  # noqa: E402
+
+COMMANDS = [
+    'events_create', 'events_edit', 'events_results', 'standings', 'events_list',
+    'event_autocomplete', 'staff_work', 'send_regis', 'events_delete',
+]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+JUDGES = 50
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Harness:
+    def __init__(self, client, events):
+        self.client = client
+        self.recorder = Recorder()
+        self.channels = {}
+        self.guild = FakeGuild(name=f'Bench Guild {events} {random.randrange(10**6)}')
+        self.op_role, self.judge_role, self.recorder_role = FakeRole(), FakeRole(), FakeRole()
+        self.operator = FakeUser([self.op_role, self.judge_role, self.recorder_role], name='operator')
+        self.judges = [FakeUser([self.judge_role]) for _ in range(JUDGES)]
+        self.titles = []
+        self.events = events
+        self.counter = 0
+
+    def channel(self, channel_id):
+        if channel_id not in self.channels:
+            self.channels[channel_id] = FakeChannel(self.recorder, channel_id)
+        return self.channels[channel_id]
+
+    def seed(self):
+        db = self.client[bot.MONGO_DATABASE]
+        for collection, indexes in INDEXES.items():
+            for keys, options in indexes:
+                db[collection].create_index(keys, **options)
+        db['config'].insert_one({
+            'guild_id': self.guild.id,
+            'bot_op_role': self.op_role.id,
+            'judge_role': self.judge_role.id,
+            'recorder_role': self.recorder_role.id,
+            'schedule_channel': self.channel(1).id,
+            'results_channel': self.channel(2).id,
+            'notification_channel': self.channel(3).id,
+            'transcript_channel': self.channel(4).id,
+            'thumbnail_channel': self.channel(5).id,
+            'tour_logo': None,
+            'registration_tournament': 'Bench Cup'
+        })
+        schedule = self.channel(1)
+        documents = []
+        for i in range(self.events):
+            title = f"Team{i} vs Team{i + 1}"
+            self.titles.append(title)
+            documents.append({
+                'guild_id': self.guild.id, 'title': title, 'team1': f"Team{i}", 'team2': f"Team{i + 1}",
+                'timestamp': 1735689600 + i * 3600, 'time_str': '1/1/2025 12:00 AM',
+                'tour_name': f"Cup {i % 4}", 'group_name': f"Group {i % 8}", 'round_no': str(i % 5),
+                'channel_id': None, 'captain1_id': None, 'captain2_id': None,
+                'judge_id': self.judges[i % JUDGES].id, 'recorder_id': None,
+                'image_url': None, 'remarks': None
+            })
+            # Handlers that edit the schedule post expect it to exist
+            message = FakeMessage(schedule, embed=bot.schedule_embed(documents[-1]))
+            schedule.messages[message.id] = message
+            documents[-1]['message_id'] = message.id
+        db['events'].insert_many(documents)
+
+    def interaction(self):
+        return FakeInteraction(self.guild, self.operator, self.recorder)
+
+    async def call(self, command):
+        self.counter += 1
+        n = self.counter
+        interaction = self.interaction()
+        if command == 'events_create':
+            await bot.events_create.callback(
+                interaction, f"Bench{n}", f"Rival{n}", '25', '12', '2030', '8', '30', 'pm',
+                tour_name='Bench Cup', group_name='A', round_no='1'
+            )
+        elif command == 'events_edit':
+            await bot.events_edit.callback(interaction, random.choice(self.titles), remarks=f"edit {n}")
+        elif command == 'events_results':
+            await bot.events_results.callback(interaction, random.choice(self.titles), 2, 1, 3)
+        elif command == 'standings':
+            await bot.standings_show.callback(interaction, f"Cup {random.randrange(4)}")
+        elif command == 'events_list':
+            await bot.events_list.callback(interaction)
+        elif command == 'event_autocomplete':
+            choices = await bot.event_autocomplete(interaction, f"team{random.randrange(100)}")
+            self.recorder.record('autocomplete', "".join(choice.name + choice.value for choice in choices))
+        elif command == 'staff_work':
+            await bot.staff_work.callback(interaction, random.choice(self.judges))
+        elif command == 'events_delete':
+            if not self.titles:
+                return
+            await bot.events_delete.callback(interaction, self.titles.pop(random.randrange(len(self.titles))), "bench")
+            view = interaction.views[0]
+            await view.confirm_button.callback(self.interaction())
+        elif command == 'send_regis':
+            await bot.send_regis.callback(interaction, self.channel(6), "Bench registration")
+            modal = interaction.modals[0]
+            modal.game_id._value = f"GAME{n:012d}"
+            # A different registrant each time, as in a real registration burst
+            await modal.on_submit(FakeInteraction(self.guild, FakeUser(), self.recorder))
+
+
+async def drain_transcripts():
+    await bot.registration_queue.close()
+    bot.registration_queue.start()
+    await bot.transcript_logger.close()
+    bot.transcript_logger.start()
+
+
+async def measure(harness, command, requests, concurrency):
+    await drain_transcripts()
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    round_trips = harness.client.round_trips
+    secondary_reads = harness.client.secondary_reads
+    calls = len(harness.recorder.calls)
+    sent = harness.recorder.bytes_sent
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await harness.call(command)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    await drain_transcripts()
+    return {
+        'command': command,
+        'requests': requests,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'throughput_per_s': requests / elapsed,
+        'mongo_round_trips': (harness.client.round_trips - round_trips) / requests,
+        'secondary_reads': (harness.client.secondary_reads - secondary_reads) / requests,
+        'discord_calls': (len(harness.recorder.calls) - calls) / requests,
+        'discord_bytes': (harness.recorder.bytes_sent - sent) / requests,
+    }
+
+
+async def run(args):
+    results = []
+    bot.wire()
+    bot.transcript_logger.start()
+    bot.registration_queue.journal_path = os.path.join(tempfile.mkdtemp(), 'registrations.jsonl')
+    bot.registration_queue.start()
+    # Pay for the render pool's spawn once, outside any measurement
+    await bot.renderer.render("warm", "up", "now")
+    for events in args.events:
+        for concurrency in args.concurrency:
+            client = FakeClient(latency=args.latency)
+            bot.mongo = AsyncMongo(client, max_workers=args.workers)
+            if args.read_profile:
+                bot.tenants = Tenants(bot.mongo[bot.MONGO_DATABASE], reader=bot.mongo.database(
+                    bot.MONGO_DATABASE, read_preference=ReadPreference.SECONDARY_PREFERRED, read_concern=ReadConcern('majority')
+                ))
+            else:
+                bot.tenants = Tenants(bot.mongo[bot.MONGO_DATABASE])
+            bot.config_cache.clear()
+            harness = Harness(client, events)
+            harness.seed()
+            bot.bot.get_channel = harness.channel
+            bot.bot.get_guild = lambda guild_id: harness.guild
+            for command in args.commands:
+                result = await measure(harness, command, args.requests, concurrency)
+                result.update(events=events, concurrency=concurrency)
+                results.append(result)
+                print(
+                    f"{command:>18} events={events:<7} c={concurrency:<3} "
+                    f"p50={result['p50_ms']:8.2f}ms p99={result['p99_ms']:8.2f}ms "
+                    f"mongo={result['mongo_round_trips']:5.2f}/call ({result['secondary_reads']:4.2f} secondary) "
+                    f"discord={result['discord_calls']:4.2f} calls {result['discord_bytes']:8.0f} B/call"
+                )
+            bot.mongo.executor.shutdown()
+    await bot.registration_queue.close()
+    await bot.transcript_logger.close()
+    bot.renderer.close()
+    return results
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = {
+            (row['command'], row['events'], row['concurrency']): row for row in json.load(f)['results']
+        }
+    regressions = []
+    for row in results:
+        before = baseline.get((row['command'], row['events'], row['concurrency']))
+        if not before:
+            continue
+        if row['p99_ms'] > before['p99_ms'] * (1 + tolerance):
+            regressions.append(f"{row['command']} events={row['events']} c={row['concurrency']}: "
+                               f"p99 {before['p99_ms']:.2f}ms -> {row['p99_ms']:.2f}ms")
+        if row['mongo_round_trips'] > before['mongo_round_trips'] + 0.01:
+            regressions.append(f"{row['command']} events={row['events']} c={row['concurrency']}: "
+                               f"round trips {before['mongo_round_trips']:.2f} -> {row['mongo_round_trips']:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', default='100,10000', help='comma-separated events per guild')
+    parser.add_argument('--concurrency', default='1,16', help='comma-separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=100, help='calls per command per configuration')
+    parser.add_argument('--commands', default=','.join(COMMANDS))
+    parser.add_argument('--latency', type=float, default=0.0005, help='simulated Mongo round trip in seconds')
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--read-profile', action='store_true', help='read-only commands use a secondary-preferred handle')
+    parser.add_argument('--compare', help='earlier results file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative p99 increase')
+    args = parser.parse_args()
+    args.events = [int(value) for value in args.events.split(',')]
+    args.concurrency = [int(value) for value in args.concurrency.split(',')]
+    args.commands = args.commands.split(',')
+
+    results = asyncio.run(run(args))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    path = os.path.join(RESULTS_DIR, f'{stamp}.json')
+    with open(path, 'w') as f:
+        json.dump({
+            'created': stamp,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'latency': args.latency,
+            'read_profile': args.read_profile,
+            'results': results
+        }, f, indent=2)
+    print(f"Results written to {path}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
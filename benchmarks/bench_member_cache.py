@@ -0,0 +1,114 @@
+# Member-cache memory and startup cost for MEMBER_CACHE=full versus lean. A client
+# built with bot.client_options() receives a large guild's GUILD_CREATE and, when
+# its options ask for chunking, every GUILD_MEMBERS_CHUNK, all through
+# discord.py's own gateway parsers. Discord sends at most 1000 members per chunk.
+#
+#   python benchmarks/bench_member_cache.py --members 50000 --guilds 2
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import discord  # noqa: E402
+from discord.state import ChunkRequest  # noqa: E402
+import bot  # noqa: E402
+
+CHUNK_SIZE = 1000
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def member_payload(user_id):
+    return {
+        'user': {'id': str(user_id), 'username': f'user{user_id}', 'discriminator': '0', 'avatar': None, 'global_name': None},
+        'roles': [],
+        'joined_at': '2024-01-01T00:00:00+00:00',
+        'deaf': False,
+        'mute': False,
+        'flags': 0,
+    }
+
+
+def guild_payload(guild_id, members):
+    # A large guild's GUILD_CREATE carries no member list; the rest comes from chunking
+    return {
+        'id': str(guild_id), 'name': f'Guild {guild_id}', 'owner_id': '1', 'member_count': members, 'large': True,
+        'roles': [{'id': str(guild_id), 'name': '@everyone', 'permissions': '0', 'position': 0, 'color': 0,
+                   'hoist': False, 'managed': False, 'mentionable': False}],
+        'channels': [], 'emojis': [], 'stickers': [], 'features': [], 'members': [],
+    }
+
+
+def run(mode, guilds, members):
+    client = discord.Client(**bot.client_options(mode))
+    state = client._connection
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    chunks = 0
+    for g in range(guilds):
+        guild_id = 10**17 + g
+        guild = state._get_create_guild(guild_payload(guild_id, members))
+        if not state._guild_needs_chunking(guild):
+            continue
+        request = ChunkRequest(guild.id, 0, None, state._get_guild, cache=state.member_cache_flags.joined)
+        state._chunk_requests[request.nonce] = request
+        count = -(-members // CHUNK_SIZE)
+        for index in range(count):
+            first = guild_id * 10 + index * CHUNK_SIZE
+            state.parse_guild_members_chunk({
+                'guild_id': str(guild_id), 'nonce': request.nonce, 'chunk_index': index, 'chunk_count': count,
+                'members': [member_payload(first + i) for i in range(min(CHUNK_SIZE, members - index * CHUNK_SIZE))],
+            })
+            chunks += 1
+        request.buffer.clear()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {
+        'mode': mode,
+        'guilds': guilds,
+        'members_per_guild': members,
+        'cached_members': sum(len(guild.members) for guild in client.guilds),
+        'chunks': chunks,
+        'retained_mb': current / 1024 / 1024,
+        'peak_mb': peak / 1024 / 1024,
+        'parse_seconds': elapsed,
+    }
+    del client, state
+    gc.collect()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--members', type=int, default=50000, help='members per guild')
+    parser.add_argument('--guilds', type=int, default=1)
+    args = parser.parse_args()
+
+    results = []
+    for mode in ('full', 'lean'):
+        result = run(mode, args.guilds, args.members)
+        results.append(result)
+        print(
+            f"{mode:>5} guilds={args.guilds} members={args.members}: cached={result['cached_members']} "
+            f"chunks={result['chunks']} retained={result['retained_mb']:7.1f} MB peak={result['peak_mb']:7.1f} MB "
+            f"parse={result['parse_seconds']:6.2f}s"
+        )
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"member_cache-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.json")
+    with open(path, 'w') as f:
+        json.dump({'python': platform.python_version(), 'discord.py': discord.__version__, 'results': results}, f, indent=2)
+    print(f"Results written to {path}")
+
+
+if __name__ == '__main__':
+    main()
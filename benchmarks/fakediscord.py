@@ -0,0 +1,152 @@
+import itertools
+
+# Just enough of discord.py's Interaction/Guild/Channel surface to drive the
+# bot's handlers offline. Everything sent to "Discord" is recorded so callers
+# can count REST calls and payload bytes.
+
+_ids = itertools.count(10**17)
+
+
+def _payload_size(content=None, embed=None, embeds=None, **kwargs):
+    size = len(content or '')
+    for item in ([embed] if embed else []) + list(embeds or []):
+        size += len(str(item.to_dict()))
+    return size
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def record(self, kind, *args, **kwargs):
+        content = args[0] if args and isinstance(args[0], str) else kwargs.get('content')
+        self.calls.append((kind, _payload_size(content, kwargs.get('embed'), kwargs.get('embeds'))))
+
+    @property
+    def bytes_sent(self):
+        return sum(size for _, size in self.calls)
+
+
+class FakeRole:
+    def __init__(self, role_id=None):
+        self.id = role_id or next(_ids)
+
+
+class FakeUser:
+    def __init__(self, roles=(), name=None, user_id=None):
+        self.id = user_id or next(_ids)
+        self.name = name or f'user{self.id}'
+        self.roles = list(roles)
+        self.mention = f'<@{self.id}>'
+
+
+class FakeMessage:
+    def __init__(self, channel, content=None, embed=None):
+        self.id = next(_ids)
+        self.channel = channel
+        self.content = content
+        self.embeds = [embed] if embed else []
+
+    @property
+    def jump_url(self):
+        return f'https://discord.com/channels/@me/{self.channel.id}/{self.id}'
+
+    async def edit(self, **kwargs):
+        self.channel.recorder.record('message.edit', **kwargs)
+        if kwargs.get('embed'):
+            self.embeds = [kwargs['embed']]
+        return self
+
+    async def delete(self):
+        self.channel.recorder.record('message.delete')
+
+
+class FakeChannel:
+    def __init__(self, recorder, channel_id=None):
+        self.id = channel_id or next(_ids)
+        self.recorder = recorder
+        self.mention = f'<#{self.id}>'
+        self.messages = {}
+
+    async def send(self, content=None, **kwargs):
+        self.recorder.record('channel.send', content, **kwargs)
+        message = FakeMessage(self, content, kwargs.get('embed'))
+        self.messages[message.id] = message
+        return message
+
+    async def fetch_message(self, message_id):
+        self.recorder.record('channel.fetch_message')
+        return self.messages.get(message_id) or FakeMessage(self)
+
+    def get_partial_message(self, message_id):
+        return self.messages.get(message_id) or FakeMessage(self)
+
+    async def set_permissions(self, target, **kwargs):
+        self.recorder.record('channel.set_permissions')
+
+
+class FakeGuild:
+    def __init__(self, name='Bench Guild', guild_id=None):
+        self.id = guild_id or next(_ids)
+        self.name = name
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.done = False
+        self.deferred = False
+
+    def is_done(self):
+        return self.done
+
+    async def send_message(self, content=None, **kwargs):
+        self.interaction.recorder.record('response.send_message', content, **kwargs)
+        self.done = True
+        self.interaction.replies.append(content or kwargs.get('embed'))
+        if kwargs.get('view'):
+            self.interaction.views.append(kwargs['view'])
+
+    async def edit_message(self, **kwargs):
+        self.interaction.recorder.record('response.edit_message', **kwargs)
+        self.done = True
+        self.interaction.edits.append(kwargs)
+
+    async def send_modal(self, modal):
+        self.interaction.recorder.record('response.send_modal')
+        self.done = True
+        self.interaction.modals.append(modal)
+
+    async def defer(self, **kwargs):
+        self.interaction.recorder.record('response.defer')
+        self.done = True
+        self.deferred = True
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        self.interaction.recorder.record('followup.send', content, **kwargs)
+        self.interaction.replies.append(content or kwargs.get('embed'))
+
+
+class FakeInteraction:
+    def __init__(self, guild, user, recorder=None, message=None):
+        self.id = next(_ids)
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = user
+        self.message = message
+        self.recorder = recorder or Recorder()
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.replies = []
+        self.edits = []
+        self.modals = []
+        self.views = []
+
+    async def edit_original_response(self, **kwargs):
+        self.recorder.record('response.edit_original', **kwargs)
+        self.edits.append(kwargs)
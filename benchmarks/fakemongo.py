@@ -0,0 +1,565 @@
+import copy
+import itertools
+import threading
+import time
+
+from bson import ObjectId, Timestamp
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+
+# Minimal in-memory stand-in for the parts of pymongo the bot uses. Every call
+# sleeps for `latency` seconds to imitate a network round trip and is counted
+# in `round_trips`. Hash indexes on every key prefix of each create_index call
+# (plus _id) serve equality lookups, so large seeded datasets don't turn every
+# find_one into a Python scan. Handles from get_database() with a non-primary
+# read preference count their reads in `secondary_reads`.
+class FakeClient:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.databases = {}
+        self.round_trips = 0
+        self.secondary_reads = 0
+        self.sessions = 0
+        self.lock = threading.Lock()
+
+    def __getitem__(self, name):
+        if name not in self.databases:
+            self.databases[name] = FakeDatabase(self, name)
+        return self.databases[name]
+
+    def get_database(self, name, read_preference=None, **options):
+        if read_preference is None or read_preference.mode == 0:
+            return self[name]
+        return FakeReadDatabase(self[name])
+
+    def start_session(self, **options):
+        with self.lock:
+            self.sessions += 1
+        return FakeSession(self)
+
+    def close(self):
+        pass
+
+    def _round_trip(self):
+        with self.lock:
+            self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+
+# Cluster time is the client's round-trip count, which only moves forward
+class FakeSession:
+    def __init__(self, client):
+        self.client = client
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.end_session()
+
+    def end_session(self):
+        pass
+
+    @property
+    def operation_time(self):
+        return Timestamp(1, self.client.round_trips + 1)
+
+    @property
+    def cluster_time(self):
+        return {'clusterTime': self.operation_time}
+
+    def advance_cluster_time(self, cluster_time):
+        pass
+
+    def advance_operation_time(self, operation_time):
+        pass
+
+
+class FakeDatabase:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self.collections = {}
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = FakeCollection(self, name)
+        return self.collections[name]
+
+
+READ_METHODS = {'find_one', 'find', 'count_documents', 'aggregate'}
+
+
+class FakeReadDatabase:
+    def __init__(self, database):
+        self.database = database
+        self.client = database.client
+        self.name = database.name
+
+    def __getitem__(self, name):
+        return FakeReadCollection(self.database[name], self)
+
+
+class FakeReadCollection:
+    def __init__(self, collection, database):
+        self.collection = collection
+        self.database = database
+        self.name = collection.name
+
+    def __getattr__(self, name):
+        method = getattr(self.collection, name)
+        if name not in READ_METHODS:
+            return method
+
+        def read(*args, **kwargs):
+            with self.database.client.lock:
+                self.database.client.secondary_reads += 1
+            return method(*args, **kwargs)
+        return read
+
+
+class InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class InsertManyResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+
+
+class UpdateResult:
+    def __init__(self, matched_count, modified_count, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+
+
+class DeleteResult:
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = iter(documents)
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.documents)
+
+    def close(self):
+        self.closed = True
+
+
+def _get(document, path):
+    for part in path.split('.'):
+        if not isinstance(document, dict):
+            return None
+        document = document.get(part)
+    return document
+
+
+def _equal(value, arg):
+    if isinstance(value, list) and not isinstance(arg, list):
+        return arg in value
+    return value == arg
+
+
+def _compare(op):
+    def check(value, arg):
+        if value is None or arg is None:
+            return False
+        try:
+            return op(value, arg)
+        except TypeError:
+            return False
+    return check
+
+
+_OPERATORS = {
+    '$eq': _equal,
+    '$ne': lambda value, arg: not _equal(value, arg),
+    '$gt': _compare(lambda value, arg: value > arg),
+    '$gte': _compare(lambda value, arg: value >= arg),
+    '$lt': _compare(lambda value, arg: value < arg),
+    '$lte': _compare(lambda value, arg: value <= arg),
+    '$in': lambda value, arg: any(_equal(value, item) for item in arg),
+    '$nin': lambda value, arg: not any(_equal(value, item) for item in arg),
+    '$exists': lambda value, arg: (value is not None) == arg,
+}
+
+
+def matches(document, query):
+    for key, condition in (query or {}).items():
+        if key == '$or':
+            if not any(matches(document, clause) for clause in condition):
+                return False
+            continue
+        if key == '$and':
+            if not all(matches(document, clause) for clause in condition):
+                return False
+            continue
+        value = _get(document, key)
+        if isinstance(condition, dict) and condition and all(k.startswith('$') for k in condition):
+            if not all(_OPERATORS[op](value, arg) for op, arg in condition.items()):
+                return False
+        elif not _equal(value, condition):
+            return False
+    return True
+
+
+def apply_update(document, update):
+    for key, value in update.get('$set', {}).items():
+        document[key] = copy.deepcopy(value)
+    for key, value in update.get('$inc', {}).items():
+        document[key] = document.get(key, 0) + value
+    for key, value in update.get('$addToSet', {}).items():
+        values = document.setdefault(key, [])
+        if value not in values:
+            values.append(value)
+    for key, value in update.get('$push', {}).items():
+        document.setdefault(key, []).append(value)
+    for key in update.get('$unset', {}):
+        document.pop(key, None)
+
+
+def project(document, projection):
+    if not projection:
+        return copy.deepcopy(document)
+    if not isinstance(projection, dict):
+        projection = {key: 1 for key in projection}
+    included = {key for key, flag in projection.items() if flag}
+    if included:
+        if projection.get('_id', 1):
+            included.add('_id')
+        return {key: copy.deepcopy(value) for key, value in document.items() if key in included}
+    return {key: copy.deepcopy(value) for key, value in document.items() if projection.get(key, 1)}
+
+
+def _sort_key(value):
+    # Mongo orders null/missing before numbers before strings
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, str(value))
+
+
+def sort_documents(documents, sort):
+    if isinstance(sort, dict):
+        sort = list(sort.items())
+    for key, direction in reversed(sort or []):
+        documents.sort(key=lambda document: _sort_key(_get(document, key)), reverse=direction < 0)
+    return documents
+
+
+def evaluate(expression, document):
+    if isinstance(expression, str) and expression.startswith('$'):
+        return _get(document, expression[1:])
+    if isinstance(expression, dict) and len(expression) == 1:
+        op, args = next(iter(expression.items()))
+        if op == '$cond':
+            if isinstance(args, dict):
+                args = [args['if'], args['then'], args['else']]
+            return evaluate(args[1] if evaluate(args[0], document) else args[2], document)
+        if op in _EXPRESSIONS:
+            return _EXPRESSIONS[op](*[evaluate(arg, document) for arg in args])
+    if isinstance(expression, dict):
+        return {key: evaluate(value, document) for key, value in expression.items()}
+    return expression
+
+
+_EXPRESSIONS = {
+    '$eq': lambda a, b: a == b,
+    '$ne': lambda a, b: a != b,
+    '$gt': lambda a, b: a is not None and b is not None and a > b,
+    '$lt': lambda a, b: a is not None and b is not None and a < b,
+    '$add': lambda *args: sum(arg or 0 for arg in args),
+    '$subtract': lambda a, b: (a or 0) - (b or 0),
+    '$multiply': lambda a, b: (a or 0) * (b or 0),
+    '$ifNull': lambda a, b: b if a is None else a,
+}
+
+
+def _accumulate(groups, key, field, spec, document):
+    op, expression = next(iter(spec.items()))
+    value = evaluate(expression, document)
+    group = groups[key]
+    if op == '$sum':
+        group[field] = group.get(field, 0) + (value if isinstance(value, (int, float)) else 0)
+    elif op == '$min':
+        if value is not None and (group.get(field) is None or value < group[field]):
+            group[field] = value
+    elif op == '$max':
+        if value is not None and (group.get(field) is None or value > group[field]):
+            group[field] = value
+    elif op == '$first':
+        group.setdefault(field, value)
+    elif op == '$last':
+        group[field] = value
+    elif op == '$push':
+        group.setdefault(field, []).append(value)
+    else:
+        raise NotImplementedError(op)
+
+
+def run_pipeline(documents, pipeline):
+    for stage in pipeline:
+        name, spec = next(iter(stage.items()))
+        if name == '$match':
+            documents = [document for document in documents if matches(document, spec)]
+        elif name == '$sort':
+            documents = sort_documents(list(documents), spec)
+        elif name == '$limit':
+            documents = documents[:spec]
+        elif name == '$skip':
+            documents = documents[spec:]
+        elif name == '$count':
+            documents = [{spec: len(documents)}]
+        elif name == '$project':
+            flags = {key: value for key, value in spec.items() if isinstance(value, (bool, int))}
+            computed = {key: value for key, value in spec.items() if key not in flags}
+            projected = []
+            for document in documents:
+                if computed or any(flags.values()):
+                    row = {'_id': document.get('_id')} if flags.get('_id', 1) else {}
+                    row.update({key: copy.deepcopy(document[key]) for key, flag in flags.items() if flag and key in document})
+                    row.update({key: evaluate(value, document) for key, value in computed.items()})
+                else:
+                    row = project(document, flags)
+                projected.append(row)
+            documents = projected
+        elif name == '$group':
+            groups = {}
+            for document in documents:
+                key = evaluate(spec['_id'], document)
+                hashable = repr(key)
+                if hashable not in groups:
+                    groups[hashable] = {'_id': key}
+                for field, accumulator in spec.items():
+                    if field != '_id':
+                        _accumulate(groups, hashable, field, accumulator, document)
+            documents = list(groups.values())
+        elif name == '$facet':
+            documents = [{field: run_pipeline(list(documents), stages) for field, stages in spec.items()}]
+        else:
+            raise NotImplementedError(name)
+    return documents
+
+
+def _index_key(value):
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+class FakeCollection:
+    def __init__(self, database, name):
+        self.database = database
+        self.client = database.client
+        self.name = name
+        self.documents = {}
+        self.sequence = {}
+        self.counter = itertools.count()
+        self.indexes = {}
+        self.index_specs = {'_id_': [('_id', 1)]}
+        self.unique = []
+        self.lock = threading.RLock()
+
+    # Hash indexes keyed by every prefix of each create_index key list, so an
+    # equality match on guild_id plus a field narrows to the same few documents
+    # a real compound index would
+    def _index(self, document):
+        for fields, index in self.indexes.items():
+            index.setdefault(tuple(_index_key(_get(document, field)) for field in fields), set()).add(document['_id'])
+
+    def _unindex(self, document):
+        for fields, index in self.indexes.items():
+            key = tuple(_index_key(_get(document, field)) for field in fields)
+            ids = index.get(key)
+            if ids:
+                ids.discard(document['_id'])
+                if not ids:
+                    del index[key]
+
+    def _candidates(self, query):
+        if '_id' in (query or {}) and not isinstance(query['_id'], dict):
+            document = self.documents.get(query['_id'])
+            return [document] if document else []
+        if not self.indexes:
+            return self.documents.values()
+        query = query or {}
+        usable = [
+            fields for fields in self.indexes
+            if all(field in query and not isinstance(query[field], (dict, list)) for field in fields)
+        ]
+        if not usable:
+            return self.documents.values()
+        fields = max(usable, key=len)
+        ids = self.indexes[fields].get(tuple(_index_key(query[field]) for field in fields), ())
+        return [self.documents[_id] for _id in ids]
+
+    def _select(self, query):
+        candidates = self._candidates(query)
+        found = [document for document in candidates if matches(document, query)]
+        if isinstance(candidates, list) and len(found) > 1:
+            # Index lookups lose insertion order; restore it for stable results
+            found.sort(key=lambda document: self.sequence[document['_id']])
+        return found
+
+    def _insert(self, document):
+        document.setdefault('_id', ObjectId())
+        if document['_id'] in self.documents:
+            raise DuplicateKeyError(f"duplicate key: _id {document['_id']}", 11000)
+        for fields, partial in self.unique:
+            if partial and not matches(document, partial):
+                continue
+            key = tuple(_index_key(_get(document, field)) for field in fields)
+            existing = self.indexes[fields].get(key, ())
+            if any(not partial or matches(self.documents[_id], partial) for _id in existing):
+                raise DuplicateKeyError(f"duplicate key: {dict(zip(fields, key))}", 11000)
+        stored = copy.deepcopy(document)
+        self.documents[stored['_id']] = stored
+        self.sequence[stored['_id']] = next(self.counter)
+        self._index(stored)
+        return stored
+
+    def _update(self, document, update):
+        self._unindex(document)
+        apply_update(document, update)
+        self._index(document)
+
+    def find_one(self, filter=None, projection=None, sort=None, **kwargs):
+        self.client._round_trip()
+        with self.lock:
+            found = sort_documents(self._select(filter), sort)
+            return project(found[0], projection) if found else None
+
+    def find(self, filter=None, projection=None, sort=None, limit=0, skip=0, **kwargs):
+        self.client._round_trip()
+        with self.lock:
+            found = sort_documents(self._select(filter), sort)[skip:]
+            if limit:
+                found = found[:limit]
+            return FakeCursor([project(document, projection) for document in found])
+
+    def count_documents(self, filter, **kwargs):
+        self.client._round_trip()
+        with self.lock:
+            return len(self._select(filter))
+
+    def aggregate(self, pipeline, **kwargs):
+        self.client._round_trip()
+        with self.lock:
+            return iter(copy.deepcopy(run_pipeline(list(self.documents.values()), pipeline)))
+
+    def insert_one(self, document, **kwargs):
+        self.client._round_trip()
+        with self.lock:
+            return InsertOneResult(self._insert(document)['_id'])
+
+    def insert_many(self, documents, ordered=True, **kwargs):
+        self.client._round_trip()
+        inserted, errors = [], []
+        with self.lock:
+            for i, document in enumerate(documents):
+                try:
+                    inserted.append(self._insert(document)['_id'])
+                except DuplicateKeyError as e:
+                    errors.append({'index': i, 'code': 11000, 'errmsg': str(e)})
+                    if ordered:
+                        break
+        if errors:
+            raise BulkWriteError({'writeErrors': errors, 'nInserted': len(inserted)})
+        return InsertManyResult(inserted)
+
+    def update_one(self, filter, update, upsert=False, **kwargs):
+        self.client._round_trip()
+        with self.lock:
+            found = self._select(filter)
+            if found:
+                self._update(found[0], update)
+                return UpdateResult(1, 1)
+            if upsert:
+                document = {key: value for key, value in filter.items() if not key.startswith('$') and not isinstance(value, dict)}
+                apply_update(document, {'$set': update.get('$setOnInsert', {})})
+                apply_update(document, update)
+                return UpdateResult(0, 0, self._insert(document)['_id'])
+            return UpdateResult(0, 0)
+
+    def update_many(self, filter, update, **kwargs):
+        self.client._round_trip()
+        with self.lock:
+            found = self._select(filter)
+            for document in found:
+                self._update(document, update)
+            return UpdateResult(len(found), len(found))
+
+    def find_one_and_update(self, filter, update, projection=None, sort=None, upsert=False, return_document=False, **kwargs):
+        self.client._round_trip()
+        with self.lock:
+            found = sort_documents(self._select(filter), sort)
+            if not found:
+                if not upsert:
+                    return None
+                document = {key: value for key, value in filter.items() if not key.startswith('$') and not isinstance(value, dict)}
+                apply_update(document, update)
+                stored = self._insert(document)
+                return project(stored, projection) if return_document else None
+            before = project(found[0], projection)
+            self._update(found[0], update)
+            return project(found[0], projection) if return_document else before
+
+    def delete_one(self, filter, **kwargs):
+        self.client._round_trip()
+        with self.lock:
+            found = self._select(filter)[:1]
+            for document in found:
+                self._unindex(document)
+                del self.documents[document['_id']]
+                del self.sequence[document['_id']]
+            return DeleteResult(len(found))
+
+    def delete_many(self, filter, **kwargs):
+        self.client._round_trip()
+        with self.lock:
+            found = self._select(filter)
+            for document in found:
+                self._unindex(document)
+                del self.documents[document['_id']]
+                del self.sequence[document['_id']]
+            return DeleteResult(len(found))
+
+    def create_index(self, keys, **kwargs):
+        self.client._round_trip()
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        name = kwargs.get('name') or '_'.join(f'{key}_{direction}' for key, direction in keys)
+        with self.lock:
+            self.index_specs[name] = list(keys)
+            for i in range(1, len(keys) + 1):
+                fields = tuple(field for field, _ in keys[:i])
+                if '_id' in fields:
+                    break
+                if fields not in self.indexes:
+                    index = self.indexes[fields] = {}
+                    for document in self.documents.values():
+                        index.setdefault(tuple(_index_key(_get(document, field)) for field in fields), set()).add(document['_id'])
+            fields = tuple(field for field, _ in keys)
+            spec = (fields, kwargs.get('partialFilterExpression'))
+            if kwargs.get('unique') and '_id' not in fields and spec not in self.unique:
+                self.unique.append(spec)
+        return name
+
+    def index_information(self):
+        self.client._round_trip()
+        return {name: {'key': keys} for name, keys in self.index_specs.items()}
@@ -0,0 +1,97 @@
+# Fires hundreds of simultaneous Judge/Recorder clicks at one event through
+# bot.claim_event, against the in-memory Mongo stand-in, and checks that each
+# role has exactly one winner and that the stored event, the rendered embed
+# and the staff counters all agree.
+#
+#   python benchmarks/stress_claims.py --claims 500 --rounds 20
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bson import ObjectId  # noqa: E402
+
+import bot  # noqa: E402
+from storage import AsyncMongo  # noqa: E402
+from tenants import Tenants  # noqa: E402
+from fakemongo import FakeClient  # noqa: E402
+from fakediscord import FakeGuild, FakeInteraction, FakeRole, FakeUser  # noqa: E402
+
+ROLES = ('judge', 'recorder')
+
+
+async def run_round(claims):
+    guild = FakeGuild()
+    judge_role, recorder_role = FakeRole(), FakeRole()
+    db = bot.tenants[guild.id]
+    await db['config'].insert_one({
+        'guild_id': guild.id,
+        'bot_op_role': FakeRole().id,
+        'judge_role': judge_role.id,
+        'recorder_role': recorder_role.id,
+        'transcript_channel': None
+    })
+    event_id = ObjectId()
+    await db['events'].insert_one({
+        '_id': event_id, 'title': 'a vs b', 'team1': 'a', 'team2': 'b',
+        'timestamp': 1735689600, 'judge_id': None, 'recorder_id': None, 'channel_id': None
+    })
+
+    attempts = [
+        (FakeInteraction(guild, FakeUser([judge_role, recorder_role])), ROLES[i % 2])
+        for i in range(claims)
+    ]
+    await asyncio.gather(*(bot.claim_event(interaction, role, event_id) for interaction, role in attempts))
+
+    failures = []
+    stored = await db['events'].find_one({'_id': event_id})
+    for role in ROLES:
+        winners = [interaction for interaction, claimed in attempts if claimed == role and interaction.edits]
+        if len(winners) != 1:
+            failures.append(f"{role}: {len(winners)} winners")
+            continue
+        winner = winners[0]
+        if stored[f'{role}_id'] != winner.user.id:
+            failures.append(f"{role}: stored {stored[f'{role}_id']} but {winner.user.id} won")
+        staffs = winner.edits[0]['embed'].fields[8].value
+        if winner.user.mention not in staffs:
+            failures.append(f"{role}: winner missing from rendered embed")
+        counters = await db['staff_stats'].find_one({'user_id': winner.user.id})
+        if not counters or counters['total'] != 1:
+            failures.append(f"{role}: staff counter is {counters}")
+    losers = sum(1 for interaction, _ in attempts if not interaction.edits)
+    if losers != claims - len(ROLES):
+        failures.append(f"{losers} rejected clicks, expected {claims - len(ROLES)}")
+    return failures
+
+
+async def main_async(args):
+    bot.mongo = AsyncMongo(FakeClient(latency=args.latency), max_workers=args.workers)
+    bot.tenants = Tenants(bot.mongo[bot.MONGO_DATABASE])
+    bot.config_cache.clear()
+    failures = []
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        failures += await run_round(args.claims)
+    elapsed = time.perf_counter() - started
+    bot.mongo.executor.shutdown()
+    print(f"{args.rounds} rounds x {args.claims} simultaneous claims in {elapsed:.2f}s")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--claims', type=int, default=300)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.001, help='simulated Mongo round trip in seconds')
+    parser.add_argument('--workers', type=int, default=32)
+    sys.exit(asyncio.run(main_async(parser.parse_args())))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,27 +1,322 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
+from discord.webhook.async_ import async_context
 import pymongo
+from pymongo import ReadPreference, ReturnDocument
+from pymongo.read_concern import ReadConcern
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
 from datetime import datetime
+from collections import Counter, deque
 import pytz
-from PIL import Image, ImageDraw, ImageFont
 import os
-import random
+import io
+import re
+import csv
+import json
+import time
+import asyncio
 from dotenv import load_dotenv
+from storage import AsyncMongo
+from cache import TTLCache
+from titles import TitleIndexRegistry
+from render import CardCache, CardRenderer, pick_background
+from transcript import TranscriptLogger
+from indexes import provision
+from staff import leaderboard, rebuild_counters, record_assignment, staff_stats
+from standings import rebuild_standings, record_result, standings
+from reminders import ReminderScheduler
+from metrics import Metrics, MongoCommandListener
+from tenants import Tenants
+from commandsync import CommandSync
+from registrations import RegistrationQueue
+from steps import Steps
+from export import EXPORTS, ExportWriter, export_query
 
 # Load environment variables
 load_dotenv()
 MONGODB_URI = os.getenv('MONGODB_URI')
+MONGO_DATABASE = os.getenv('MONGO_DATABASE', 'tourbot')
 DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
+MONGO_WORKERS = int(os.getenv('MONGO_WORKERS', '16'))
+MONGO_MIN_POOL = int(os.getenv('MONGO_MIN_POOL', '0'))
+MONGO_COMPRESSORS = os.getenv('MONGO_COMPRESSORS', 'zlib')
+# Read routing: commands listed in READ_COMMANDS read through a READ_PREFERENCE handle
+# (majority read concern, causally consistent per guild); 'primary' turns routing off
+READ_PREFERENCE = os.getenv('READ_PREFERENCE', 'secondaryPreferred')
+READ_COMMANDS = {
+    name.strip() for name in os.getenv(
+        'READ_COMMANDS', 'events_show,events_list,staff_work,staff_leaderboard,standings,export,event_autocomplete,load_reminders'
+    ).split(',') if name.strip()
+}
+CONFIG_CACHE_TTL = float(os.getenv('CONFIG_CACHE_TTL', '300'))
+CONFIG_CACHE_SIZE = int(os.getenv('CONFIG_CACHE_SIZE', '1024'))
+RENDER_WORKERS = int(os.getenv('RENDER_WORKERS', '0')) or None
+RENDER_CACHE_DIR = os.getenv('RENDER_CACHE_DIR', 'cache/cards')
+RENDER_CACHE_MEMORY_MB = int(os.getenv('RENDER_CACHE_MEMORY_MB', '32'))
+RENDER_CACHE_DISK_MB = int(os.getenv('RENDER_CACHE_DISK_MB', '256'))
+TRANSCRIPT_FLUSH_INTERVAL = float(os.getenv('TRANSCRIPT_FLUSH_INTERVAL', '2'))
+TRANSCRIPT_QUEUE_SIZE = int(os.getenv('TRANSCRIPT_QUEUE_SIZE', '1000'))
+# Sharding: SHARD_COUNT unset runs one gateway connection; 'auto' or a number runs
+# an auto-sharded client, optionally limited to SHARD_IDS (set by launcher.py)
+SHARD_COUNT = os.getenv('SHARD_COUNT', '').strip().lower()
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv('SHARD_IDS', '').split(',') if shard_id.strip()] or None
+# COMMAND_SYNC: 'auto' syncs only when the command tree changed, 'force' always, 'off' never.
+# SYNC_GUILDS copies the tree to those guilds and syncs there instead, which applies instantly.
+COMMAND_SYNC = os.getenv('COMMAND_SYNC', 'auto').strip().lower()
+SYNC_GUILDS = [int(guild_id) for guild_id in os.getenv('SYNC_GUILDS', '').split(',') if guild_id.strip()]
+# MEMBER_CACHE: 'full' caches every member of every guild, 'lean' caches none
+MEMBER_CACHE = os.getenv('MEMBER_CACHE', 'full').strip().lower()
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9108'))
+REGISTRATION_JOURNAL = os.getenv('REGISTRATION_JOURNAL', 'cache/registrations.jsonl')
+REGISTRATION_QUEUE_SIZE = int(os.getenv('REGISTRATION_QUEUE_SIZE', '5000'))
+REGISTRATION_BATCH_SIZE = int(os.getenv('REGISTRATION_BATCH_SIZE', '100'))
+REGISTRATION_FLUSH_INTERVAL = float(os.getenv('REGISTRATION_FLUSH_INTERVAL', '1'))
+SIDE_EFFECT_CONCURRENCY = int(os.getenv('SIDE_EFFECT_CONCURRENCY', '4'))
+REMINDER_OFFSETS = [int(minutes) * 60 for minutes in os.getenv('REMINDER_OFFSETS', '60,10').split(',') if minutes.strip()]
+
+# Latency histograms for interactions, Mongo commands, Discord REST calls and renders
+metrics = Metrics()
+
+# Process-wide resources: the Mongo client and its worker pool, the card cache
+# and the render pool. They are built by wire() from main() rather than at
+# import, because the spawned render workers re-import the main script as
+# __mp_main__ and must not each build their own.
+mongo_client = mongo = tenants = card_cache = renderer = command_sync = None
+
+# All guilds share one database; tenants[guild_id] scopes every query to that guild
+READ_PREFERENCES = {
+    'primary': ReadPreference.PRIMARY,
+    'primaryPreferred': ReadPreference.PRIMARY_PREFERRED,
+    'secondary': ReadPreference.SECONDARY,
+    'secondaryPreferred': ReadPreference.SECONDARY_PREFERRED,
+    'nearest': ReadPreference.NEAREST,
+}
+
+def wire():
+    global mongo_client, mongo, tenants, card_cache, renderer, command_sync
+    # Handlers go through the async wrapper, never the raw client. Each worker
+    # thread holds at most one connection at a time, so the pool matches the workers.
+    mongo_client = pymongo.MongoClient(
+        MONGODB_URI,
+        maxPoolSize=MONGO_WORKERS,
+        minPoolSize=min(MONGO_MIN_POOL, MONGO_WORKERS),
+        compressors=MONGO_COMPRESSORS,
+        event_listeners=[MongoCommandListener(metrics)]
+    )
+    mongo = AsyncMongo(mongo_client, max_workers=MONGO_WORKERS)
+    if READ_PREFERENCE != 'primary' and READ_COMMANDS:
+        tenants = Tenants(mongo[MONGO_DATABASE], reader=mongo.database(
+            MONGO_DATABASE, read_preference=READ_PREFERENCES[READ_PREFERENCE], read_concern=ReadConcern('majority')
+        ))
+    else:
+        tenants = Tenants(mongo[MONGO_DATABASE])
+    # Match cards are rendered off-loop in worker processes, behind a content-addressed cache
+    card_cache = CardCache(
+        RENDER_CACHE_DIR,
+        memory_bytes=RENDER_CACHE_MEMORY_MB * 1024 * 1024,
+        disk_bytes=RENDER_CACHE_DISK_MB * 1024 * 1024
+    )
+    renderer = CardRenderer(max_workers=RENDER_WORKERS, cache=card_cache, metrics=metrics)
+    # Command tree sync, skipped when the tree matches the last synced one
+    command_sync = CommandSync(bot.tree, mongo[MONGO_DATABASE]['command_sync'])
+
+# Read-only commands opt into the read handle by name
+def read_db(guild_id, command):
+    return tenants.read(guild_id) if command in READ_COMMANDS else tenants[guild_id]
 
-# Connect to MongoDB
-mongo_client = pymongo.MongoClient(MONGODB_URI)
+# Guild config rarely changes, so it is cached in-process; config_set/config_edit write through
+config_cache = TTLCache(maxsize=CONFIG_CACHE_SIZE, ttl=CONFIG_CACHE_TTL)
+_MISSING = object()
+
+# Per-guild event title index backing autocomplete; kept current by create/edit/delete
+title_indexes = TitleIndexRegistry()
 
 # Bot setup
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
-bot = commands.Bot(command_prefix='!', intents=intents)
+class TourBot(commands.AutoShardedBot if SHARD_COUNT else commands.Bot):
+    metrics_server = None
+
+    async def setup_hook(self):
+        self.add_dynamic_items(EventClaimButton)
+        self.http.request = metrics.time_requests(self.http.request)
+        # Interaction responses and followups bypass self.http for the shared webhook adapter
+        adapter = async_context.get()
+        adapter.request = metrics.time_requests(adapter.request)
+        transcript_logger.start()
+        registration_queue.start()
+        reminders.start()
+        if METRICS_PORT:
+            try:
+                self.metrics_server = await metrics.serve(METRICS_HOST, METRICS_PORT)
+            except OSError as e:
+                print(f'Error starting metrics endpoint on {METRICS_HOST}:{METRICS_PORT}: {e}')
+
+    async def close(self):
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+        await reminders.close()
+        await registration_queue.close()
+        await transcript_logger.close()
+        await super().close()
+
+# Mentions are rendered from stored IDs and permission checks use the member
+# sent with each interaction, so nothing needs the member cache. 'lean' drops
+# the members intent, startup chunking and member caching; 'full' keeps them.
+def client_options(member_cache):
+    intents = discord.Intents.default()
+    intents.message_content = True
+    if member_cache == 'lean':
+        return dict(intents=intents, chunk_guilds_at_startup=False, member_cache_flags=discord.MemberCacheFlags.none())
+    intents.members = True
+    return dict(intents=intents)
+
+if SHARD_COUNT and SHARD_COUNT != 'auto':
+    bot = TourBot(command_prefix='!', **client_options(MEMBER_CACHE), shard_count=int(SHARD_COUNT), shard_ids=SHARD_IDS)
+else:
+    bot = TourBot(command_prefix='!', **client_options(MEMBER_CACHE))
+
+async def send_transcript(channel_id, content):
+    transcript_channel = bot.get_channel(channel_id)
+    if transcript_channel:
+        await transcript_channel.send(content)
+
+# Transcript lines are batched per channel and sent by a background task
+transcript_logger = TranscriptLogger(
+    send_transcript, max_queue=TRANSCRIPT_QUEUE_SIZE, flush_interval=TRANSCRIPT_FLUSH_INTERVAL
+)
+
+async def send_reminder(guild_id, event_id, offset):
+    guild = bot.get_guild(guild_id)
+    if not guild:
+        return
+    db = tenants[guild_id]
+    # Marking the offset as sent in the same write makes delivery at-most-once across restarts
+    event = await db['events'].find_one_and_update(
+        {'_id': event_id, 'reminders_sent': {'$ne': offset}},
+        {'$addToSet': {'reminders_sent': offset}},
+        return_document=ReturnDocument.AFTER
+    )
+    config = await get_config(db, guild_id)
+    if not event or not config or not config.get('notification_channel'):
+        return
+    notification_channel = bot.get_channel(config['notification_channel'])
+    if not notification_channel:
+        return
+    people = [
+        f"{label}: <@{event[field]}>"
+        for label, field in (("Team1", 'captain1_id'), ("Team2", 'captain2_id'), ("Judge", 'judge_id'), ("Recorder", 'recorder_id'))
+        if event.get(field)
+    ]
+    await notification_channel.send(
+        f":alarm_clock: **{event['title']}** starts <t:{event['timestamp']}:R> (<t:{event['timestamp']}:t>)"
+        + (f"\n{' | '.join(people)}" if people else "")
+    )
+
+# Registration digests go to one channel, as many lines per embed as fit, and as
+# many embeds per message as Discord's 6000-character total allows
+REGISTRATION_CHANNEL = 88685575446
+DIGEST_CHARS = 4000
+MESSAGE_EMBED_CHARS = 6000
+MESSAGE_EMBEDS = 10
+
+async def notify_registrants(items, message):
+    for record, interaction in items:
+        if interaction is not None:
+            try:
+                await interaction.followup.send(message.format(**record), ephemeral=True)
+            except Exception as e:
+                print(f'Error notifying registration: {e}')
+
+# Only the insert may raise (and be retried by the queue); everything after it
+# is best effort, so a retry never sees its own records as duplicates
+async def flush_registrations(guild_id, items):
+    db = tenants[guild_id]
+    duplicates = set()
+    try:
+        await db['registrations'].insert_many([dict(record) for record, _ in items], ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get('writeErrors', [])
+        if any(error['code'] != 11000 for error in errors):
+            raise
+        duplicates = {error['index'] for error in errors}
+
+    if duplicates:
+        # A record that landed in an earlier attempt or before a crash is
+        # accepted, not reported as a duplicate of itself
+        saved = {
+            (row['tournament_key'], row['user_id'], row['game_id'])
+            for row in await db['registrations'].find(
+                {'user_id': {'$in': [items[i][0]['user_id'] for i in duplicates]}, 'tournament_key': {'$exists': True}},
+                {'tournament_key': 1, 'user_id': 1, 'game_id': 1}
+            )
+        }
+        duplicates = {
+            i for i in duplicates
+            if (items[i][0].get('tournament_key'), items[i][0]['user_id'], items[i][0]['game_id']) not in saved
+        }
+    accepted = [record for i, (record, _) in enumerate(items) if i not in duplicates]
+    await notify_registrants(
+        [items[i] for i in sorted(duplicates)],
+        "Registration not saved: you or Game ID {game_id} are already registered for this tournament."
+    )
+    if not accepted:
+        return
+
+    # One digest per registration post, chunked to Discord's embed limits
+    posts = {}
+    for record in accepted:
+        posts.setdefault((record['tournament_key'], record.get('image')), []).append(record)
+    embeds = []
+    for (tournament, image), records in posts.items():
+        description = f"**{tournament}**"
+        for record in records:
+            line = f"<@{record['user_id']}> - `{record['game_id']}`"
+            if description and len(description) + 1 + len(line) > DIGEST_CHARS:
+                embeds.append(discord.Embed(title="Tournament Registrations", description=description, color=discord.Color.green()))
+                description = ""
+            description = f"{description}\n{line}" if description else line
+        embeds.append(discord.Embed(title="Tournament Registrations", description=description, color=discord.Color.green()))
+        if image:
+            embeds[-1].set_image(url=image)
+    messages, size = [[]], 0
+    for embed in embeds:
+        if messages[-1] and (size + len(embed) > MESSAGE_EMBED_CHARS or len(messages[-1]) == MESSAGE_EMBEDS):
+            messages.append([])
+            size = 0
+        messages[-1].append(embed)
+        size += len(embed)
+    regis_channel = bot.get_channel(REGISTRATION_CHANNEL)
+    if regis_channel:
+        # A failed message loses only its own lines; the records are saved either way
+        for chunk in messages:
+            try:
+                await regis_channel.send(embeds=chunk)
+            except Exception as e:
+                print(f'Error posting registration digest ({sum(map(len, chunk))} characters): {e}')
+
+    try:
+        config = await get_config(db, guild_id)
+        if config and config['transcript_channel']:
+            for record in accepted:
+                await transcript_logger.log(
+                    config['transcript_channel'], f"Registration by <@{record['user_id']}> with Game ID: {record['game_id']}"
+                )
+    except Exception as e:
+        print(f'Error logging registrations: {e}')
+
+async def registrations_failed(guild_id, items):
+    await notify_registrants(items, "Registration for Game ID {game_id} could not be saved, please try again later.")
+
+# Modal submits are acknowledged at once; records reach Mongo and the digest in batches
+registration_queue = RegistrationQueue(
+    flush_registrations, REGISTRATION_JOURNAL, max_queue=REGISTRATION_QUEUE_SIZE,
+    max_batch=REGISTRATION_BATCH_SIZE, flush_interval=REGISTRATION_FLUSH_INTERVAL, failed=registrations_failed
+)
+
+# Pre-match reminders for every guild, driven by a single timer task
+reminders = ReminderScheduler(send_reminder, REMINDER_OFFSETS)
 
 # Utility functions
 def get_timestamp(dd, mm, yyyy, hour, minute, ampm=None):
@@ -32,48 +327,200 @@ def get_timestamp(dd, mm, yyyy, hour, minute, ampm=None):
     except ValueError:
         return None
 
-def create_tournament_image(team1, team2, time_str, logo_path, thumbnail_path):
-    bg_files = ['images/bg1.jpg', 'images/bg2.jpg', 'images/bg3.jpg']
-    base_image = Image.open(random.choice(bg_files)).convert('RGBA').resize((800, 600))
-    draw = ImageDraw.Draw(base_image)
-    font = ImageFont.truetype('fonts/arial.ttf', 40)
+def format_time(dd, mm, yyyy, hour, minute, ampm=None):
+    return f"{dd}/{mm}/{yyyy} {hour}:{minute} {'AM' if ampm and ampm.lower() == 'am' else 'PM'}"
+
+async def get_config(db, guild_id):
+    config = config_cache.get(guild_id, _MISSING)
+    if config is _MISSING:
+        config = await db['config'].find_one({'guild_id': guild_id})
+        config_cache.set(guild_id, config)
+    return config
 
-    if logo_path and os.path.exists(logo_path):
-        logo = Image.open(logo_path).convert('RGBA').resize((200, 100))
-        base_image.paste(logo, (300, 20), logo)
+# Index provisioning for the shared tenant collections, once per process
+provisioned_databases = set()
 
-    vs_text = f"{team1} VS {team2}"
-    draw.text((base_image.width // 2 - 100, base_image.height // 2), vs_text, fill='white', font=font)
+async def provision_storage():
+    if MONGO_DATABASE in provisioned_databases:
+        return
+    provisioned_databases.add(MONGO_DATABASE)
+    try:
+        problems = await provision(mongo[MONGO_DATABASE])
+    except Exception as e:
+        provisioned_databases.discard(MONGO_DATABASE)
+        print(f'Error provisioning indexes for {MONGO_DATABASE}: {e}')
+        return
+    for problem in problems:
+        print(f'Index check: {problem}')
 
-    draw.text((50, base_image.height - 50), time_str, fill='white', font=font)
+# Reminder rebuild from the indexed timestamp range, once per guild per process
+reminder_guilds = set()
 
-    if thumbnail_path and os.path.exists(thumbnail_path):
-        thumbnail = Image.open(thumbnail_path).convert('RGBA').resize((100, 100))
-        base_image.paste(thumbnail, (base_image.width - 120, base_image.height - 120), thumbnail)
+async def load_reminders(guild):
+    if guild.id in reminder_guilds:
+        return
+    reminder_guilds.add(guild.id)
+    db = read_db(guild.id, 'load_reminders')
+    try:
+        events = await db['events'].find(
+            {'timestamp': {'$gt': int(datetime.now(pytz.UTC).timestamp())}},
+            {'timestamp': 1, 'reminders_sent': 1}
+        )
+    except Exception as e:
+        reminder_guilds.discard(guild.id)
+        print(f'Error loading reminders for {guild.name}: {e}')
+        return
+    for event in events:
+        reminders.schedule(guild.id, event)
 
-    output_path = 'images/output.png'
-    base_image.save(output_path)
-    return output_path
+async def load_all_reminders():
+    await asyncio.gather(*(load_reminders(guild) for guild in bot.guilds))
+
+# Title indexes are built at startup and on join, so the first autocomplete
+# keystroke doesn't wait on a full scan of the guild's events
+async def warm_titles(guild):
+    try:
+        await title_indexes.get(guild.id, read_db(guild.id, 'event_autocomplete'))
+    except Exception as e:
+        print(f'Error loading event titles for {guild.name}: {e}')
+
+async def warm_all_titles():
+    await asyncio.gather(*(warm_titles(guild) for guild in bot.guilds))
+
+async def sync_commands():
+    for guild in [discord.Object(id=guild_id) for guild_id in SYNC_GUILDS] or [None]:
+        where = f'to guild {guild.id}' if guild else 'globally'
+        try:
+            synced = await command_sync.sync(guild, force=COMMAND_SYNC == 'force')
+        except Exception as e:
+            print(f'Error syncing commands {where}: {e}')
+            continue
+        if synced is None:
+            print(f'Commands unchanged {where}, sync skipped')
+        else:
+            print(f'Synced {len(synced)} command(s) {where}')
+
+# Startup work runs in the background; the loop only holds weak references to
+# tasks, so they are kept here until they finish
+background_tasks = set()
+
+def run_in_background(coro):
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
 
 # Bot ready event
 @bot.event
 async def on_ready():
-    print(f'Bot {bot.user} is ready!')
-    try:
-        synced = await bot.tree.sync()
-        print(f'Synced {len(synced)} command(s)')
-    except Exception as e:
-        print(f'Error syncing commands: {e}')
+    print(f'Bot {bot.user} is ready!' + (f' (shards {bot.shard_ids or "all"} of {bot.shard_count})' if SHARD_COUNT else ''))
+    # Commands are global, so with shards split across processes only one of them syncs
+    if COMMAND_SYNC != 'off' and (not SHARD_IDS or 0 in SHARD_IDS):
+        run_in_background(sync_commands())
+    run_in_background(provision_storage())
+    run_in_background(load_all_reminders())
+    run_in_background(warm_all_titles())
+
+@bot.event
+async def on_guild_join(guild):
+    await load_reminders(guild)
+    await warm_titles(guild)
+
+def mention(user_id, fallback):
+    return f"<@{user_id}>" if user_id else fallback
+
+# Schedule embed, rendered purely from the stored event document
+def schedule_embed(event):
+    timestamp = event['timestamp']
+    utc_time = event.get('time_str') or datetime.fromtimestamp(timestamp, pytz.UTC).strftime('%d/%m/%Y %I:%M %p')
+    embed = discord.Embed(title=f":calendar_spiral: {event['title']}", color=discord.Color.blue())
+    embed.add_field(name="UTC Time", value=utc_time, inline=False)
+    embed.add_field(name="Local Time", value=f"<t:{timestamp}> (<t:{timestamp}:R>)", inline=False)
+    embed.add_field(name="Tournament", value=event.get('tour_name') or "Not specified", inline=True)
+    embed.add_field(name="Group", value=event.get('group_name') or "Not specified", inline=True)
+    embed.add_field(name="Round", value=event.get('round_no') or "Not specified", inline=True)
+    embed.add_field(name="Channel", value=f"<#{event['channel_id']}>" if event.get('channel_id') else "Not specified", inline=False)
+    embed.add_field(name="Team1 Captain", value=mention(event.get('captain1_id'), event['team1']), inline=True)
+    embed.add_field(name="Team2 Captain", value=mention(event.get('captain2_id'), event['team2']), inline=True)
+    embed.add_field(name="Staffs", value=(
+        f":white_small_square: **Judge**: {mention(event.get('judge_id'), 'Awaiting selection')}\n"
+        f":white_small_square: **Recorder**: {mention(event.get('recorder_id'), 'Awaiting selection')}"
+    ), inline=False)
+    if event.get('remarks'):
+        embed.add_field(name="Remarks", value=event['remarks'], inline=False)
+    if event.get('image_url'):
+        embed.set_image(url=event['image_url'])
+    return embed
+
+# Judge/Recorder buttons. The custom_id carries the event's _id, so one class
+# registered at startup serves every schedule message, across restarts.
+class EventClaimButton(discord.ui.DynamicItem[discord.ui.Button], template=r'event:(?P<role>judge|recorder):(?P<event_id>[0-9a-f]{24})'):
+    def __init__(self, role, event_id):
+        super().__init__(discord.ui.Button(
+            label=role.capitalize(),
+            style=discord.ButtonStyle.primary,
+            custom_id=f"event:{role}:{event_id}"
+        ))
+        self.role = role
+        self.event_id = ObjectId(event_id)
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match['role'], match['event_id'])
+
+    @metrics.timed('button', 'event_claim')
+    async def callback(self, interaction: discord.Interaction):
+        await claim_event(interaction, self.role, self.event_id)
+
+def event_buttons(event_id):
+    view = discord.ui.View(timeout=None)
+    view.add_item(EventClaimButton('judge', event_id))
+    view.add_item(EventClaimButton('recorder', event_id))
+    # Clicks are dispatched through the registered EventClaimButton, so the sent
+    # view is stopped up front and never held in the client's view store
+    view.stop()
+    return view
+
+async def claim_event(interaction, role, event_id):
+    db = tenants[interaction.guild.id]
+    config = await get_config(db, interaction.guild.id)
+    label = role.capitalize()
+    if not config or not any(r.id == config[f'{role}_role'] for r in interaction.user.roles):
+        await interaction.response.send_message(f"You don't have the {label} role!", ephemeral=True)
+        return
+
+    # Conditional on the slot still being empty, so of any number of
+    # simultaneous clicks exactly one matches and wins
+    field = f'{role}_id'
+    event = await db['events'].find_one_and_update(
+        {'_id': event_id, field: None},
+        {'$set': {field: interaction.user.id}},
+        return_document=ReturnDocument.AFTER
+    )
+    if not event:
+        current = await db['events'].find_one({'_id': event_id}, {field: 1})
+        if not current:
+            await interaction.response.send_message("Event not found!", ephemeral=True)
+        elif current.get(field) == interaction.user.id:
+            await interaction.response.send_message(f"You are already the {label} for this event!", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"This event already has a {label}: <@{current[field]}>", ephemeral=True)
+        return
+
+    if event.get('channel_id'):
+        channel = bot.get_channel(event['channel_id'])
+        if channel:
+            await channel.set_permissions(interaction.user, view_channel=True, send_messages=True)
+    await interaction.response.edit_message(embed=schedule_embed(event))
+    await record_assignment(db, role, None, interaction.user.id)
+    await interaction.followup.send(f"{interaction.user.mention} assigned as {label}!", ephemeral=True)
 
 # Autocomplete for event titles
+@metrics.timed('autocomplete')
 async def event_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
-    tour_name = interaction.guild.name.replace(" ", "_").lower()
-    db = mongo_client[tour_name]
-    events = db['events'].find()
-    return [
-        app_commands.Choice(name=event['title'], value=event['title'])
-        for event in events if current.lower() in event['title'].lower()
-    ][:25]
+    db = read_db(interaction.guild.id, 'event_autocomplete')
+    index = await title_indexes.get(interaction.guild.id, db)
+    return [app_commands.Choice(name=title, value=title) for title in index.search(current)]
 
 # Tournament command group
 @app_commands.guild_only()
@@ -97,6 +544,7 @@ bot.tree.add_command(tournament)
     thumbnail_channel="Channel for thumbnails",
     tour_logo="Tournament logo URL"
 )
+@metrics.timed('command')
 async def config_set(
     interaction: discord.Interaction,
     bot_op_role: discord.Role,
@@ -113,8 +561,7 @@ async def config_set(
         await interaction.response.send_message("You don't have permission!", ephemeral=True)
         return
 
-    tour_name = interaction.guild.name.replace(" ", "_").lower()
-    db = mongo_client[tour_name]
+    db = tenants[interaction.guild.id]
     config_collection = db['config']
     config_data = {
         'guild_id': interaction.guild.id,
@@ -128,7 +575,16 @@ async def config_set(
         'thumbnail_channel': thumbnail_channel.id,
         'tour_logo': tour_logo
     }
-    config_collection.update_one({'guild_id': interaction.guild.id}, {'$set': config_data}, upsert=True)
+    try:
+        # The stored document as updated, so fields config_set doesn't cover
+        # (the open registration) stay in the cache
+        config_data = await config_collection.find_one_and_update(
+            {'guild_id': interaction.guild.id}, {'$set': config_data}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+    except Exception:
+        config_cache.invalidate(interaction.guild.id)
+        raise
+    config_cache.set(interaction.guild.id, config_data)
 
     await log_action(db, interaction, f"Config set by {interaction.user.mention}")
     await interaction.response.send_message("Configuration set successfully!", ephemeral=True)
@@ -146,6 +602,7 @@ async def config_set(
     thumbnail_channel="Channel for thumbnails",
     tour_logo="Tournament logo URL"
 )
+@metrics.timed('command')
 async def config_edit(
     interaction: discord.Interaction,
     bot_op_role: discord.Role = None,
@@ -158,9 +615,8 @@ async def config_edit(
     thumbnail_channel: discord.TextChannel = None,
     tour_logo: str = None
 ):
-    tour_name = interaction.guild.name.replace(" ", "_").lower()
-    db = mongo_client[tour_name]
-    config = db['config'].find_one({'guild_id': interaction.guild.id})
+    db = tenants[interaction.guild.id]
+    config = await get_config(db, interaction.guild.id)
 
     if not config or not any(role.id == config['bot_op_role'] for role in interaction.user.roles):
         await interaction.response.send_message("You don't have permission!", ephemeral=True)
@@ -187,12 +643,89 @@ async def config_edit(
         update_data['tour_logo'] = tour_logo
 
     if update_data:
-        db['config'].update_one({'guild_id': interaction.guild.id}, {'$set': update_data})
+        try:
+            await db['config'].update_one({'guild_id': interaction.guild.id}, {'$set': update_data})
+        except Exception:
+            config_cache.invalidate(interaction.guild.id)
+            raise
+        config_cache.set(interaction.guild.id, {**config, **update_data})
         await log_action(db, interaction, f"Config edited by {interaction.user.mention}")
         await interaction.response.send_message("Configuration updated!", ephemeral=True)
     else:
         await interaction.response.send_message("Please specify at least one field to edit!", ephemeral=True)
 
+# /cache_stats
+@tournament.command(name="cache_stats", description="Show cache statistics")
+@metrics.timed('command')
+async def cache_stats(interaction: discord.Interaction):
+    db = tenants[interaction.guild.id]
+    config = await get_config(db, interaction.guild.id)
+    if not config or not any(role.id == config['bot_op_role'] for role in interaction.user.roles):
+        await interaction.response.send_message("You don't have permission!", ephemeral=True)
+        return
+
+    stats = config_cache.stats()
+    card_stats = card_cache.stats()
+    embed = discord.Embed(title="Cache Statistics", color=discord.Color.blue())
+    embed.add_field(name="Config Hits", value=stats['hits'], inline=True)
+    embed.add_field(name="Config Misses", value=stats['misses'], inline=True)
+    embed.add_field(name="Config Hit Rate", value=f"{stats['hit_rate']:.1%}", inline=True)
+    embed.add_field(name="Config Entries", value=f"{stats['size']}/{CONFIG_CACHE_SIZE}", inline=True)
+    embed.add_field(name="Config Evictions", value=stats['evictions'], inline=True)
+    embed.add_field(name="Card Hits", value=f"{card_stats['memory_hits']} memory / {card_stats['disk_hits']} disk", inline=False)
+    embed.add_field(name="Card Misses", value=card_stats['misses'], inline=True)
+    embed.add_field(name="Card Hit Rate", value=f"{card_stats['hit_rate']:.1%}", inline=True)
+    embed.add_field(name="Card Storage", value=(
+        f"{card_stats['memory_entries']} in memory ({card_stats['memory_bytes'] // 1024} KiB), "
+        f"{card_stats['disk_entries']} on disk ({card_stats['disk_bytes'] // 1024} KiB)"
+    ), inline=False)
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+def format_timings(rows, label, limit=10):
+    rows = sorted(rows, key=lambda row: row[1], reverse=True)[:limit]
+    return "\n".join(
+        f"`{label(labels)}` {count}x p50 {p50 * 1000:.0f}ms p99 {p99 * 1000:.0f}ms"
+        for labels, count, _, p50, p99 in rows
+    ) or "No data yet"
+
+# /stats
+@tournament.command(name="stats", description="Show latency and database statistics")
+@metrics.timed('command')
+async def stats(interaction: discord.Interaction):
+    db = tenants[interaction.guild.id]
+    config = await get_config(db, interaction.guild.id)
+    if not config or not any(role.id == config['bot_op_role'] for role in interaction.user.roles):
+        await interaction.response.send_message("You don't have permission!", ephemeral=True)
+        return
+
+    embed = discord.Embed(title="Bot Statistics", color=discord.Color.blue())
+    embed.add_field(name="Interactions", value=format_timings(
+        metrics.snapshot('interaction_seconds'),
+        lambda labels: f"{labels['kind']} {labels['name']}{'' if labels['status'] == 'ok' else ' (failed)'}"
+    ), inline=False)
+    embed.add_field(name="Mongo Commands", value=format_timings(
+        metrics.snapshot('mongo_command_seconds'),
+        lambda labels: f"{labels['command']}{'' if labels['status'] == 'ok' else ' (failed)'}"
+    ), inline=False)
+    embed.add_field(name="Discord Requests", value=format_timings(
+        metrics.snapshot('discord_request_seconds'),
+        lambda labels: f"{labels['method']} {labels['route']}", limit=5
+    ), inline=False)
+    embed.add_field(name="Handler Steps", value=format_timings(
+        metrics.snapshot('step_seconds'),
+        lambda labels: f"{labels['command']} {labels['step']}{'' if labels['status'] == 'ok' else ' (failed)'}"
+    ), inline=False)
+    embed.add_field(name="Card Renders", value=format_timings(metrics.snapshot('render_seconds'), lambda labels: "render"), inline=False)
+    embed.add_field(name="Background Work", value=(
+        f"Transcript: {transcript_logger.lines} lines in {transcript_logger.messages} messages\n"
+        f"Registrations: {registration_queue.flushed} saved in {registration_queue.batches} batches, "
+        f"{registration_queue.unflushed} pending\n"
+        f"Reminders: {reminders.sent} sent"
+    ), inline=False)
+    if METRICS_PORT:
+        embed.set_footer(text=f"Prometheus metrics on {METRICS_HOST}:{METRICS_PORT}/metrics")
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
 # /send_regis
 @tournament.command(name="send_regis", description="Register for a tournament")
 @app_commands.describe(
@@ -200,42 +733,87 @@ async def config_edit(
     data="Tournament data",
     embedded_image="Embedded image URL"
 )
+@metrics.timed('command')
 async def send_regis(interaction: discord.Interaction, channel: discord.TextChannel, data: str, embedded_image: str = None):
-    tour_name = interaction.guild.name.replace(" ", "_").lower()
-    db = mongo_client[tour_name]
-    config = db['config'].find_one({'guild_id': interaction.guild.id})
+    db = tenants[interaction.guild.id]
+    config = await get_config(db, interaction.guild.id)
     if not config:
         await interaction.response.send_message("Config not set! Use /config_set first.", ephemeral=True)
         return
 
-    embed = discord.Embed(title="Tournament Registration", description=data, color=discord.Color.green())
-    if embedded_image:
-        embed.set_image(url=embedded_image)
-    embed.add_field(name="Discord Username", value=interaction.user.mention, inline=False)
-    embed.add_field(name="Game ID", value="Pending input", inline=False)
+    # The tournament comes from the operator-opened registration, never from
+    # `data`, which the registrant types; uniqueness and the digest key on it
+    tournament_key = config.get('registration_tournament')
+    if not tournament_key:
+        await interaction.response.send_message("Registrations are not open! An operator opens them with /regis_open.", ephemeral=True)
+        return
 
     class RegistrationForm(discord.ui.Modal, title="Enter Game ID"):
         game_id = discord.ui.TextInput(label="Game ID", placeholder="e.g., 25CDF5286DC38DAD")
 
+        @metrics.timed('modal', 'registration')
         async def on_submit(self, interaction: discord.Interaction):
-            regis_channel = bot.get_channel(88685575446)
-            if not regis_channel:
-                await interaction.response.send_message("Registration channel not found!", ephemeral=True)
+            game_id = self.game_id.value.strip()
+            if not game_id:
+                await interaction.response.send_message("Game ID cannot be empty!", ephemeral=True)
                 return
-
-            embed.set_field_at(1, name="Game ID", value=self.game_id.value, inline=False)
-            await regis_channel.send(embed=embed)
-            db['registrations'].insert_one({
+            record = {
+                'guild_id': interaction.guild.id,
                 'user_id': interaction.user.id,
                 'username': interaction.user.name,
-                'game_id': self.game_id.value,
+                'game_id': game_id,
+                'tournament_key': tournament_key,
+                'tournament': data[:1000],
+                'image': embedded_image,
                 'timestamp': datetime.utcnow()
-            })
-            await log_action(db, interaction, f"Registration by {interaction.user.mention} with Game ID: {self.game_id.value}")
+            }
+            try:
+                queued = registration_queue.submit(record, interaction)
+            except asyncio.QueueFull:
+                await interaction.response.send_message("Registrations are busy, please try again in a moment.", ephemeral=True)
+                return
+            if not queued:
+                await interaction.response.send_message("You or this Game ID already have a registration in progress!", ephemeral=True)
+                return
             await interaction.response.send_message("Registration submitted!", ephemeral=True)
 
     await interaction.response.send_modal(RegistrationForm())
 
+# /regis_open
+@tournament.command(name="regis_open", description="Open registrations for a tournament")
+@app_commands.describe(tour_name="Tournament that /send_regis registers for")
+@metrics.timed('command')
+async def regis_open(interaction: discord.Interaction, tour_name: str):
+    await set_registration(interaction, tour_name.strip()[:100])
+
+# /regis_close
+@tournament.command(name="regis_close", description="Close registrations")
+@metrics.timed('command')
+async def regis_close(interaction: discord.Interaction):
+    await set_registration(interaction, None)
+
+async def set_registration(interaction, tour_name):
+    db = tenants[interaction.guild.id]
+    config = await get_config(db, interaction.guild.id)
+    if not config or not any(role.id == config['bot_op_role'] for role in interaction.user.roles):
+        await interaction.response.send_message("You don't have permission!", ephemeral=True)
+        return
+    if tour_name == "":
+        await interaction.response.send_message("Tournament name cannot be empty!", ephemeral=True)
+        return
+
+    update = {'$set': {'registration_tournament': tour_name}} if tour_name else {'$unset': {'registration_tournament': ''}}
+    try:
+        await db['config'].update_one({'guild_id': interaction.guild.id}, update)
+    except Exception:
+        config_cache.invalidate(interaction.guild.id)
+        raise
+    config_cache.set(interaction.guild.id, {**config, 'registration_tournament': tour_name})
+
+    message = f"Registrations opened for {tour_name}" if tour_name else "Registrations closed"
+    await log_action(db, interaction, f"{message} by {interaction.user.mention}")
+    await interaction.response.send_message(f"{message}!", ephemeral=True)
+
 # /staff_data
 @tournament.command(name="staff_data", description="Submit staff data")
 @app_commands.describe(
@@ -245,6 +823,7 @@ async def send_regis(interaction: discord.Interaction, channel: discord.TextChan
     discord_tag="Discord tag",
     discord_id="Discord ID"
 )
+@metrics.timed('command')
 async def staff_data(
     interaction: discord.Interaction,
     game_name: str,
@@ -253,9 +832,8 @@ async def staff_data(
     discord_tag: str,
     discord_id: str
 ):
-    tour_name = interaction.guild.name.replace(" ", "_").lower()
-    db = mongo_client[tour_name]
-    config = db['config'].find_one({'guild_id': interaction.guild.id})
+    db = tenants[interaction.guild.id]
+    config = await get_config(db, interaction.guild.id)
     if not config:
         await interaction.response.send_message("Config not set! Use /config_set first.", ephemeral=True)
         return
@@ -273,7 +851,7 @@ async def staff_data(
     embed.add_field(name="Discord ID", value=discord_id, inline=False)
 
     await staff_channel.send(embed=embed)
-    db['staff'].insert_one({
+    await db['staff'].insert_one({
         'game_name': game_name,
         'game_id': game_id,
         'discord_username': discord_username,
@@ -285,31 +863,86 @@ async def staff_data(
     await interaction.response.send_message("Staff data submitted!", ephemeral=True)
 
 # /staff_work
-@tournament.command(name="staff_work", description="Show events judged by a staff member")
+def format_date(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%d/%m/%Y')
+
+def format_breakdown(rows):
+    return "\n".join(
+        f"- {row['_id'] or 'Not specified'}: {row['judged']} judged, {row['recorded']} recorded" for row in rows
+    )[:1024]
+
+@tournament.command(name="staff_work", description="Show events worked by a staff member")
 @app_commands.describe(staff="Staff member to check")
+@metrics.timed('command')
 async def staff_work(interaction: discord.Interaction, staff: discord.User):
-    tour_name = interaction.guild.name.replace(" ", "_").lower()
-    db = mongo_client[tour_name]
-    config = db['config'].find_one({'guild_id': interaction.guild.id})
+    db = read_db(interaction.guild.id, 'staff_work')
+    config = await get_config(db, interaction.guild.id)
     if not config:
         await interaction.response.send_message("Config not set! Use /config_set first.", ephemeral=True)
         return
 
-    events = db['events'].find({'judge_id': staff.id})
+    stats = await staff_stats(db, staff.id)
+    if not stats['judged'] and not stats['recorded']:
+        embed = discord.Embed(title=f"Staff Work for {staff.name}", description="No events worked.", color=discord.Color.purple())
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await log_action(db, interaction, f"Viewed work history for {staff.mention} by {interaction.user.mention}")
+        return
+
     event_list = [
-        f"- {event['title']} ({datetime.fromtimestamp(event['timestamp']).strftime('%d/%m/%Y')})"
-        for event in events
+        f"- {event['title']} ({format_date(event['timestamp'])})"
+        f"{' [J]' if event.get('judge_id') == staff.id else ''}{' [R]' if event.get('recorder_id') == staff.id else ''}"
+        for event in stats['recent']
     ]
-    total_events = len(event_list)
-
     embed = discord.Embed(
-        title=f"Judge Work for {staff.name}",
-        description=f"Total Events Judged: {total_events}\n\n" + "\n".join(event_list) if event_list else "No events judged.",
+        title=f"Staff Work for {staff.name}",
+        description=(
+            f"Total Events Judged: {stats['judged']}\n"
+            f"Total Events Recorded: {stats['recorded']}\n"
+            f"Active: {format_date(stats['first'])} - {format_date(stats['last'])}\n\n"
+            f"Most recent:\n" + "\n".join(event_list)
+        ),
         color=discord.Color.purple()
     )
+    if stats['by_tournament']:
+        embed.add_field(name="By Tournament", value=format_breakdown(stats['by_tournament']), inline=False)
+    if stats['by_round']:
+        embed.add_field(name="By Round", value=format_breakdown(stats['by_round']), inline=False)
     await interaction.response.send_message(embed=embed, ephemeral=True)
     await log_action(db, interaction, f"Viewed work history for {staff.mention} by {interaction.user.mention}")
 
+# /staff_leaderboard
+@tournament.command(name="staff_leaderboard", description="Show the staff leaderboard")
+@app_commands.describe(rebuild="Recount from all events first (bot operators only)")
+@metrics.timed('command')
+async def staff_leaderboard(interaction: discord.Interaction, rebuild: bool = False):
+    db = tenants[interaction.guild.id] if rebuild else read_db(interaction.guild.id, 'staff_leaderboard')
+    config = await get_config(db, interaction.guild.id)
+    if not config:
+        await interaction.response.send_message("Config not set! Use /config_set first.", ephemeral=True)
+        return
+
+    if rebuild:
+        if not any(role.id == config['bot_op_role'] for role in interaction.user.roles):
+            await interaction.response.send_message("You don't have permission!", ephemeral=True)
+            return
+        await rebuild_counters(db)
+
+    rows = await leaderboard(db)
+    if not rows:
+        await interaction.response.send_message("No staff work recorded yet!", ephemeral=True)
+        return
+
+    embed = discord.Embed(
+        title="Staff Leaderboard",
+        description="\n".join(
+            f"{rank}. <@{row['user_id']}> - {row['total']} ({row.get('judged', 0)} judged, {row.get('recorded', 0)} recorded)"
+            for rank, row in enumerate(rows, start=1)
+        ),
+        color=discord.Color.gold()
+    )
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+    await log_action(db, interaction, f"Staff leaderboard viewed by {interaction.user.mention}")
+
 # /events create
 @tournament.command(name="events_create", description="Create a tournament event")
 @app_commands.describe(
@@ -332,6 +965,7 @@ async def staff_work(interaction: discord.Interaction, staff: discord.User):
     image_url="Image URL",
     remarks="Remarks"
 )
+@metrics.timed('command')
 async def events_create(
     interaction: discord.Interaction,
     team1: str,
@@ -353,9 +987,8 @@ async def events_create(
     image_url: str = None,
     remarks: str = None
 ):
-    tour_name_db = interaction.guild.name.replace(" ", "_").lower()
-    db = mongo_client[tour_name_db]
-    config = db['config'].find_one({'guild_id': interaction.guild.id})
+    db = tenants[interaction.guild.id]
+    config = await get_config(db, interaction.guild.id)
     if not config:
         await interaction.response.send_message("Config not set! Use /config_set first.", ephemeral=True)
         return
@@ -368,96 +1001,17 @@ async def events_create(
     if not timestamp:
         await interaction.response.send_message("Invalid date/time format!", ephemeral=True)
         return
-    time_str = f"{dd}/{mm}/{yyyy} {hour}:{minute} {'AM' if ampm and ampm.lower() == 'am' else 'PM'}"
-
-    embed = discord.Embed(
-        title=f":calendar_spiral: {team1} vs {team2}",
-        color=discord.Color.blue()
-    )
-    embed.add_field(name="UTC Time", value=time_str, inline=False)
-    embed.add_field(name="Local Time", value=f"<t:{timestamp}> (<t:{timestamp}:R>)", inline=False)
-    embed.add_field(name="Tournament", value=tour_name or "Not specified", inline=True)
-    embed.add_field(name="Group", value=group_name or "Not specified", inline=True)
-    embed.add_field(name="Round", value=round_no or "Not specified", inline=True)
-    embed.add_field(name="Channel", value=channel.mention if channel else "Not specified", inline=False)
-    embed.add_field(name="Team1 Captain", value=captain1.mention if captain1 else team1, inline=True)
-    embed.add_field(name="Team2 Captain", value=captain2.mention if captain2 else team2, inline=True)
-    embed.add_field(name="Staffs", value=(
-        f":white_small_square: **Judge**: {judge.mention if judge else 'Awaiting selection'}\n"
-        f":white_small_square: **Recorder**: {recorder.mention if recorder else 'Awaiting selection'}"
-    ), inline=False)
-    if remarks:
-        embed.add_field(name="Remarks", value=remarks, inline=False)
-    if image_url:
-        embed.set_image(url=image_url)
-
-    class TournamentButtons(discord.ui.View):
-        def __init__(self, judge_role_id, recorder_role_id, channel_id):
-            super().__init__(timeout=None)
-            self.judge_role_id = judge_role_id
-            self.recorder_role_id = recorder_role_id
-            self.channel_id = channel_id
-
-        @discord.ui.button(label="Judge", style=discord.ButtonStyle.primary)
-        async def judge_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-            if not any(role.id == self.judge_role_id for role in interaction.user.roles):
-                await interaction.response.send_message("You don't have the Judge role!", ephemeral=True)
-                return
-            embed.set_field_at(6, name="Staffs", value=(
-                f":white_small_square: **Judge**: {interaction.user.mention} ({interaction.user.name})\n"
-                f":white_small_square: **Recorder**: {embed.fields[6].value.split('Recorder: ')[1]}"
-            ), inline=False)
-            if self.channel_id:
-                channel = bot.get_channel(self.channel_id)
-                if channel:
-                    await channel.set_permissions(interaction.user, view_channel=True, send_messages=True)
-            await interaction.response.edit_message(embed=embed)
-            db['events'].update_one(
-                {'message_id': interaction.message.id},
-                {'$set': {'judge_id': interaction.user.id}}
-            )
-            await interaction.followup.send(f"{interaction.user.mention} assigned as Judge!", ephemeral=True)
-
-        @discord.ui.button(label="Recorder", style=discord.ButtonStyle.primary)
-        async def recorder_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-            if not any(role.id == self.recorder_role_id for role in interaction.user.roles):
-                await interaction.response.send_message("You don't have the Recorder role!", ephemeral=True)
-                return
-            embed.set_field_at(6, name="Staffs", value=(
-                f":white_small_square: **Judge**: {embed.fields[6].value.split('Judge: ')[1].split('\n')[0]}\n"
-                f":white_small_square: **Recorder**: {interaction.user.mention} ({interaction.user.name})"
-            ), inline=False)
-            if self.channel_id:
-                channel = bot.get_channel(self.channel_id)
-                if channel:
-                    await channel.set_permissions(interaction.user, view_channel=True, send_messages=True)
-            await interaction.response.edit_message(embed=embed)
-            db['events'].update_one(
-                {'message_id': interaction.message.id},
-                {'$set': {'recorder_id': interaction.user.id}}
-            )
-            await interaction.followup.send(f"{interaction.user.mention} assigned as Recorder!", ephemeral=True)
-
-    logo_path = 'images/logo.png'
-    thumbnail_path = 'images/thumbnail.png'
-    image_path = create_tournament_image(team1, team2, time_str, logo_path, thumbnail_path)
-
-    schedule_channel = bot.get_channel(config['schedule_channel'])
-    if not schedule_channel:
-        await interaction.response.send_message("Schedule channel not found!", ephemeral=True)
-        return
+    time_str = format_time(dd, mm, yyyy, hour, minute, ampm)
+    background = pick_background(f"{team1} vs {team2}")
 
-    message = await schedule_channel.send(
-        embed=embed,
-        view=TournamentButtons(config['judge_role'], config['recorder_role'], channel.id if channel else None),
-        file=discord.File(image_path)
-    )
-
-    db['events'].insert_one({
+    event = {
+        '_id': ObjectId(),
         'title': f"{team1} vs {team2}",
         'team1': team1,
         'team2': team2,
         'timestamp': timestamp,
+        'time_str': time_str,
+        'background': background,
         'tour_name': tour_name,
         'group_name': group_name,
         'round_no': round_no,
@@ -467,15 +1021,248 @@ async def events_create(
         'judge_id': judge.id if judge else None,
         'recorder_id': recorder.id if recorder else None,
         'image_url': image_url,
-        'remarks': remarks,
-        'message_id': message.id
-    })
+        'remarks': remarks
+    }
+
+    schedule_channel = bot.get_channel(config['schedule_channel'])
+    if not schedule_channel:
+        await interaction.response.send_message("Schedule channel not found!", ephemeral=True)
+        return
+
+    # Rendering and posting outlast the 3 second interaction window under load
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    steps = Steps(metrics, 'events_create', SIDE_EFFECT_CONCURRENCY)
+    image = await steps.run('render', renderer.render(team1, team2, time_str, background=background))
+    message = image and await steps.run('schedule_post', schedule_channel.send(
+        embed=schedule_embed(event),
+        view=event_buttons(event['_id']),
+        file=discord.File(image, filename='match.png')
+    ))
+    if not message:
+        await interaction.followup.send(f"Could not post the event: {steps.failed[0]} failed!", ephemeral=True)
+        return
+
+    event['message_id'] = message.id
+    await steps.run('insert', db['events'].insert_one(event))
+    if steps.failed:
+        # Take the post down again, as events_import does for unsaved rows
+        await steps.run('schedule_unpost', message.delete())
+        if 'schedule_unpost' in steps.failed:
+            await interaction.followup.send(
+                f"The event could not be saved, and its schedule message could not be removed; delete {message.jump_url} and try again!",
+                ephemeral=True
+            )
+        else:
+            await interaction.followup.send("The event could not be saved, please try again!", ephemeral=True)
+        return
+    reminders.schedule(interaction.guild.id, event)
+    title_indexes.add(interaction.guild.id, f"{team1} vs {team2}")
 
     notification_channel = bot.get_channel(config['notification_channel'])
-    if notification_channel:
-        await notification_channel.send(f"New event: {team1} vs {team2} created!")
-    await log_action(db, interaction, f"Event {team1} vs {team2} created by {interaction.user.mention}")
-    await interaction.response.send_message("Event created successfully!", ephemeral=True)
+    await steps.gather(
+        judge_counter=record_assignment(db, 'judge', None, judge.id) if judge else None,
+        recorder_counter=record_assignment(db, 'recorder', None, recorder.id) if recorder else None,
+        notification=notification_channel.send(f"New event: {team1} vs {team2} created!") if notification_channel else None,
+        transcript=log_action(db, interaction, f"Event {team1} vs {team2} created by {interaction.user.mention}"),
+    )
+    await interaction.followup.send(steps.report("Event created successfully!"), ephemeral=True)
+
+# /events import
+IMPORT_MAX_ROWS = int(os.getenv('IMPORT_MAX_ROWS', '200'))
+IMPORT_MAX_BYTES = 1024 * 1024
+IMPORT_PROGRESS_INTERVAL = 5
+IMPORT_ID = re.compile(r'<[@#][!&]?(\d+)>|(\d+)')
+
+# Rows from a CSV file with a header line, or a JSON list of objects, using
+# the events_create parameter names. Users and channels are IDs or mentions.
+def import_rows(data, filename):
+    text = data.decode('utf-8-sig')
+    if filename.lower().endswith('.json'):
+        rows = json.loads(text)
+        for row in rows.get('events', []) if isinstance(rows, dict) else rows:
+            yield {key: '' if value is None else str(value) for key, value in row.items()} if isinstance(row, dict) else {}
+    else:
+        yield from csv.DictReader(io.StringIO(text))
+
+def import_id(value, field):
+    if not value:
+        return None
+    match = IMPORT_ID.fullmatch(value)
+    if not match:
+        raise ValueError(f"{field} must be an ID or a mention")
+    return int(match[1] or match[2])
+
+def import_event(row):
+    row = {key.strip().lower(): (value or '').strip() for key, value in row.items() if isinstance(key, str)}
+    team1, team2 = row.get('team1'), row.get('team2')
+    if not team1 or not team2:
+        raise ValueError("team1 and team2 are required")
+    when = [row.get(field, '') for field in ('dd', 'mm', 'yyyy', 'hour', 'minute')]
+    timestamp = get_timestamp(*when, row.get('ampm'))
+    if not timestamp:
+        raise ValueError("invalid date/time")
+    title = f"{team1} vs {team2}"
+    return {
+        '_id': ObjectId(),
+        'title': title,
+        'team1': team1,
+        'team2': team2,
+        'timestamp': timestamp,
+        'time_str': format_time(*when, row.get('ampm')),
+        'background': pick_background(title),
+        'tour_name': row.get('tour_name') or None,
+        'group_name': row.get('group_name') or None,
+        'round_no': row.get('round_no') or None,
+        'channel_id': import_id(row.get('channel'), 'channel'),
+        'captain1_id': import_id(row.get('captain1'), 'captain1'),
+        'captain2_id': import_id(row.get('captain2'), 'captain2'),
+        'judge_id': import_id(row.get('judge'), 'judge'),
+        'recorder_id': import_id(row.get('recorder'), 'recorder'),
+        'image_url': row.get('image_url') or None,
+        'remarks': row.get('remarks') or None
+    }
+
+# After a failed insert_many, keeps the posted events that were stored anyway
+# and takes down the schedule posts of the rest; posts that can't be checked or
+# deleted are reported with their links for cleanup
+async def unpost_unsaved(db, schedule_channel, posted, errors):
+    try:
+        stored = {event['_id'] for event in await db['events'].find(
+            {'_id': {'$in': [event['_id'] for _, event in posted]}}, {'_id': 1}
+        )}
+    except Exception as e:
+        print(f"Error checking imported events: {e}")
+        for row_no, event in posted:
+            message = schedule_channel.get_partial_message(event['message_id'])
+            errors.append((row_no, f"may not have been saved; check {message.jump_url}"))
+        return []
+    kept = []
+    for row_no, event in posted:
+        if event['_id'] in stored:
+            kept.append((row_no, event))
+            continue
+        message = schedule_channel.get_partial_message(event['message_id'])
+        try:
+            await message.delete()
+            errors.append((row_no, "could not be saved; its post was removed"))
+        except Exception as e:
+            print(f"Error deleting unsaved event post: {e}")
+            errors.append((row_no, f"could not be saved; delete its post at {message.jump_url}"))
+    return kept
+
+@tournament.command(name="events_import", description="Create tournament events from a CSV or JSON file")
+@app_commands.describe(file="CSV or JSON file with one event per row, using the events_create option names")
+@metrics.timed('command')
+async def events_import(interaction: discord.Interaction, file: discord.Attachment):
+    db = tenants[interaction.guild.id]
+    config = await get_config(db, interaction.guild.id)
+    if not config:
+        await interaction.response.send_message("Config not set! Use /config_set first.", ephemeral=True)
+        return
+
+    if not any(role.id == config['bot_op_role'] for role in interaction.user.roles):
+        await interaction.response.send_message("You don't have permission!", ephemeral=True)
+        return
+
+    if file.size > IMPORT_MAX_BYTES:
+        await interaction.response.send_message("File is too large!", ephemeral=True)
+        return
+
+    schedule_channel = bot.get_channel(config['schedule_channel'])
+    if not schedule_channel:
+        await interaction.response.send_message("Schedule channel not found!", ephemeral=True)
+        return
+
+    await interaction.response.send_message(f"Reading {file.filename}...", ephemeral=True)
+    events, errors, titles = [], [], set()
+    try:
+        for row_no, row in enumerate(import_rows(await file.read(), file.filename), start=1):
+            if row_no > IMPORT_MAX_ROWS:
+                errors.append((row_no, f"only the first {IMPORT_MAX_ROWS} rows are imported"))
+                break
+            try:
+                event = import_event(row)
+            except ValueError as e:
+                errors.append((row_no, str(e)))
+                continue
+            if event['title'] in titles:
+                errors.append((row_no, f"{event['title']} appears in an earlier row"))
+                continue
+            titles.add(event['title'])
+            events.append((row_no, event))
+    except (UnicodeDecodeError, ValueError, TypeError, csv.Error) as e:
+        await interaction.edit_original_response(content=f"Could not read {file.filename}: {e}")
+        return
+
+    if titles:
+        existing = {event['title'] for event in await db['events'].find({'title': {'$in': list(titles)}}, {'title': 1})}
+        errors += [(row_no, f"{event['title']} already exists") for row_no, event in events if event['title'] in existing]
+        events = [(row_no, event) for row_no, event in events if event['title'] not in existing]
+
+    # Cards render in parallel on the render pool, at most SIDE_EFFECT_CONCURRENCY
+    # rows ahead, while messages are posted one at a time in row order; discord.py
+    # waits out the channel's rate-limit bucket between sends, so the import never
+    # bursts into 429s
+    def start_render(event):
+        return asyncio.ensure_future(
+            renderer.render(event['team1'], event['team2'], event['time_str'], background=event['background'])
+        )
+    ahead = max(1, SIDE_EFFECT_CONCURRENCY)
+    renders = deque(start_render(event) for _, event in events[:ahead])
+    posted = []
+    progress_at = time.monotonic() + IMPORT_PROGRESS_INTERVAL
+    for done, (row_no, event) in enumerate(events, start=1):
+        render = renders.popleft()
+        if done - 1 + ahead < len(events):
+            renders.append(start_render(events[done - 1 + ahead][1]))
+        try:
+            image = await render
+            message = await schedule_channel.send(
+                embed=schedule_embed(event),
+                view=event_buttons(event['_id']),
+                file=discord.File(image, filename='match.png')
+            )
+        except Exception as e:
+            errors.append((row_no, f"could not post: {e}"))
+            continue
+        event['message_id'] = message.id
+        posted.append((row_no, event))
+        if time.monotonic() >= progress_at:
+            progress_at = time.monotonic() + IMPORT_PROGRESS_INTERVAL
+            await interaction.edit_original_response(content=f"Posted {done}/{len(events)} events...")
+
+    if posted:
+        try:
+            await db['events'].insert_many([event for _, event in posted], ordered=False)
+        except Exception as e:
+            print(f"Error saving imported events: {e}")
+            posted = await unpost_unsaved(db, schedule_channel, posted, errors)
+    if posted:
+        assignments = Counter()
+        for _, event in posted:
+            reminders.schedule(interaction.guild.id, event)
+            title_indexes.add(interaction.guild.id, event['title'])
+            for role in ('judge', 'recorder'):
+                if event[f'{role}_id']:
+                    assignments[role, event[f'{role}_id']] += 1
+        for (role, user_id), count in assignments.items():
+            await record_assignment(db, role, None, user_id, count)
+
+        notification_channel = bot.get_channel(config['notification_channel'])
+        if notification_channel:
+            await notification_channel.send(f"{len(posted)} new events imported!")
+        await log_action(db, interaction, f"{len(posted)} events imported from {file.filename} by {interaction.user.mention}")
+
+    content = f"Imported {len(posted)} of {len(posted) + len(errors)} rows from {file.filename}."
+    if not errors:
+        await interaction.edit_original_response(content=content)
+        return
+    errors.sort()
+    report = "\n".join(f"Row {row_no}: {message}" for row_no, message in errors)
+    await interaction.edit_original_response(
+        content=f"{content}\n{len(errors)} rows failed:\n{report}"[:2000],
+        attachments=[discord.File(io.BytesIO(report.encode()), filename='import-errors.txt')]
+    )
 
 # /events edit
 @tournament.command(name="events_edit", description="Edit a tournament event")
@@ -501,6 +1288,7 @@ async def events_create(
     remarks="Remarks"
 )
 @app_commands.autocomplete(title=event_autocomplete)
+@metrics.timed('command')
 async def events_edit(
     interaction: discord.Interaction,
     title: str,
@@ -523,19 +1311,22 @@ async def events_edit(
     image_url: str = None,
     remarks: str = None
 ):
-    tour_name_db = interaction.guild.name.replace(" ", "_").lower()
-    db = mongo_client[tour_name_db]
-    config = db['config'].find_one({'guild_id': interaction.guild.id})
+    db = tenants[interaction.guild.id]
+    config = await get_config(db, interaction.guild.id)
     if not config or not any(role.id == config['bot_op_role'] for role in interaction.user.roles):
         await interaction.response.send_message("You don't have permission!", ephemeral=True)
         return
 
-    event = db['events'].find_one({'title': title})
+    event = await db['events'].find_one({'title': title})
     if not event:
         await interaction.response.send_message("Event not found!", ephemeral=True)
         return
 
+    # Re-rendering the card and uploading it can outlast the 3-second window
+    await interaction.response.defer(ephemeral=True, thinking=True)
     update_data = {}
+    timestamp = None
+    time_str = None
     if team1:
         update_data['team1'] = team1
     if team2:
@@ -543,7 +1334,10 @@ async def events_edit(
     if dd and mm and yyyy and hour and minute:
         timestamp = get_timestamp(dd, mm, yyyy, hour, minute, ampm)
         if timestamp:
+            time_str = format_time(dd, mm, yyyy, hour, minute, ampm)
             update_data['timestamp'] = timestamp
+            update_data['time_str'] = time_str
+            update_data['reminders_sent'] = []
     if tour_name:
         update_data['tour_name'] = tour_name
     if group_name:
@@ -568,75 +1362,92 @@ async def events_edit(
     if update_data:
         new_title = f"{team1 or event['team1']} vs {team2 or event['team2']}"
         update_data['title'] = new_title
-        db['events'].update_one({'title': title}, {'$set': update_data})
-
+        # The card only shows teams and time; events created before time_str was stored keep theirs
+        card_time = time_str or event.get('time_str')
+        rerender = bool((team1 or team2 or time_str) and card_time)
+        if rerender:
+            update_data['background'] = event.get('background') or pick_background(event['title'])
+        # The stored document as updated, so concurrent edits can't leave the post stale
+        updated = await db['events'].find_one_and_update(
+            {'_id': event['_id']}, {'$set': update_data}, return_document=ReturnDocument.AFTER
+        )
+        if not updated:
+            # Deleted since the lookup above
+            await interaction.followup.send("Event not found!", ephemeral=True)
+            return
+        title_indexes.rename(interaction.guild.id, title, new_title)
+        if timestamp:
+            reminders.schedule(interaction.guild.id, updated)
+        if judge:
+            await record_assignment(db, 'judge', event.get('judge_id'), judge.id)
+        if recorder:
+            await record_assignment(db, 'recorder', event.get('recorder_id'), recorder.id)
+
+        # Rebuilt from that document and applied to a partial message: one REST
+        # call, and the post always matches the database
         schedule_channel = bot.get_channel(config['schedule_channel'])
-        if schedule_channel:
-            message = await schedule_channel.fetch_message(event['message_id'])
-            embed = message.embeds[0]
-            embed.title = f":calendar_spiral: {new_title}"
-            for i, field in enumerate(embed.fields):
-                if field.name == "UTC Time" and timestamp:
-                    embed.set_field_at(i, name="UTC Time", value=f"{dd}/{mm}/{yyyy} {hour}:{minute} {ampm or ''}", inline=False)
-                elif field.name == "Local Time" and timestamp:
-                    embed.set_field_at(i, name="Local Time", value=f"<t:{timestamp}> (<t:{timestamp}:R>)", inline=False)
-                elif field.name == "Tournament":
-                    embed.set_field_at(i, name="Tournament", value=tour_name or event['tour_name'] or "Not specified", inline=True)
-                elif field.name == "Group":
-                    embed.set_field_at(i, name="Group", value=group_name or event['group_name'] or "Not specified", inline=True)
-                elif field.name == "Round":
-                    embed.set_field_at(i, name="Round", value=round_no or event['round_no'] or "Not specified", inline=True)
-                elif field.name == "Channel":
-                    embed.set_field_at(i, name="Channel", value=channel.mention if channel else "Not specified", inline=False)
-                elif field.name == "Team1 Captain":
-                    embed.set_field_at(i, name="Team1 Captain", value=captain1.mention if captain1 else team1 or event['team1'], inline=True)
-                elif field.name == "Team2 Captain":
-                    embed.set_field_at(i, name="Team2 Captain", value=captain2.mention if captain2 else team2 or event['team2'], inline=True)
-                elif field.name == "Staffs":
-                    embed.set_field_at(i, name="Staffs", value=(
-                        f":white_small_square: **Judge**: {judge.mention if judge else event['judge_id'] and bot.get_user(event['judge_id']).mention or 'Awaiting selection'}\n"
-                        f":white_small_square: **Recorder**: {recorder.mention if recorder else event['recorder_id'] and bot.get_user(event['recorder_id']).mention or 'Awaiting selection'}"
-                    ), inline=False)
-                elif field.name == "Remarks":
-                    embed.set_field_at(i, name="Remarks", value=remarks or event['remarks'] or "None", inline=False)
-            if image_url:
-                embed.set_image(url=image_url)
-            await message.edit(embed=embed)
+        if schedule_channel and event['message_id']:
+            message = schedule_channel.get_partial_message(event['message_id'])
+            embed = schedule_embed(updated)
+            if rerender:
+                image = await renderer.render(
+                    team1 or event['team1'], team2 or event['team2'], card_time, background=update_data['background']
+                )
+                await message.edit(embed=embed, attachments=[discord.File(image, filename='match.png')])
+            else:
+                await message.edit(embed=embed)
 
         await log_action(db, interaction, f"Event {title} edited by {interaction.user.mention}")
-        await interaction.response.send_message("Event updated successfully!", ephemeral=True)
+        await interaction.followup.send("Event updated successfully!", ephemeral=True)
     else:
-        await interaction.response.send_message("Please specify at least one field to edit!", ephemeral=True)
+        await interaction.followup.send("Please specify at least one field to edit!", ephemeral=True)
 
 # /events delete
 @tournament.command(name="events_delete", description="Delete a tournament event")
 @app_commands.describe(title="Event title (e.g., 'chok vs chok')", reason="Reason for deletion")
 @app_commands.autocomplete(title=event_autocomplete)
+@metrics.timed('command')
 async def events_delete(interaction: discord.Interaction, title: str, reason: str = None):
-    tour_name_db = interaction.guild.name.replace(" ", "_").lower()
-    db = mongo_client[tour_name_db]
-    config = db['config'].find_one({'guild_id': interaction.guild.id})
+    db = tenants[interaction.guild.id]
+    config = await get_config(db, interaction.guild.id)
     if not config or not any(role.id == config['bot_op_role'] for role in interaction.user.roles):
         await interaction.response.send_message("You don't have permission!", ephemeral=True)
         return
 
-    event = db['events'].find_one({'title': title})
+    event = await db['events'].find_one({'title': title})
     if not event:
         await interaction.response.send_message("Event not found!", ephemeral=True)
         return
 
     class ConfirmDelete(discord.ui.View):
         @discord.ui.button(label="Confirm", style=discord.ButtonStyle.danger)
+        @metrics.timed('button', 'events_delete_confirm')
         async def confirm_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-            db['events'].delete_one({'title': title})
+            await interaction.response.defer()
+            steps = Steps(metrics, 'events_delete', SIDE_EFFECT_CONCURRENCY)
+            await steps.run('delete', db['events'].delete_one({'_id': event['_id']}))
+            if steps.failed:
+                await interaction.edit_original_response(content="Could not delete the event!", view=None)
+                return
+            title_indexes.remove(interaction.guild.id, title)
+            reminders.cancel(interaction.guild.id, event['_id'])
+
             schedule_channel = bot.get_channel(config['schedule_channel'])
-            if schedule_channel and event['message_id']:
-                message = await schedule_channel.fetch_message(event['message_id'])
-                await message.delete()
-            await log_action(db, interaction, f"Event {title} deleted by {interaction.user.mention}. Reason: {reason or 'None'}")
-            await interaction.response.edit_message(content="Event deleted successfully!", view=None)
+            await steps.gather(
+                judge_counter=record_assignment(db, 'judge', event.get('judge_id'), None) if event.get('judge_id') else None,
+                recorder_counter=record_assignment(db, 'recorder', event.get('recorder_id'), None) if event.get('recorder_id') else None,
+                schedule_delete=(
+                    schedule_channel.get_partial_message(event['message_id']).delete()
+                    if schedule_channel and event['message_id'] else None
+                ),
+                transcript=log_action(db, interaction, f"Event {title} deleted by {interaction.user.mention}. Reason: {reason or 'None'}"),
+            )
+            await interaction.edit_original_response(content="Event deleted successfully!", view=None)
+            if steps.failed:
+                await interaction.followup.send(steps.report("The event was deleted."), ephemeral=True)
 
         @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+        @metrics.timed('button', 'events_delete_cancel')
         async def cancel_button(self, interaction: discord.Interaction, button: discord.ui.Button):
             await interaction.response.edit_message(content="Deletion cancelled.", view=None)
 
@@ -646,37 +1457,20 @@ async def events_delete(interaction: discord.Interaction, title: str, reason: st
 @tournament.command(name="events_show", description="Show event details")
 @app_commands.describe(title="Event title (e.g., 'chok vs chok')")
 @app_commands.autocomplete(title=event_autocomplete)
+@metrics.timed('command')
 async def events_show(interaction: discord.Interaction, title: str):
-    tour_name_db = interaction.guild.name.replace(" ", "_").lower()
-    db = mongo_client[tour_name_db]
-    config = db['config'].find_one({'guild_id': interaction.guild.id})
+    db = read_db(interaction.guild.id, 'events_show')
+    config = await get_config(db, interaction.guild.id)
     if not config:
         await interaction.response.send_message("Config not set! Use /config_set first.", ephemeral=True)
         return
 
-    event = db['events'].find_one({'title': title})
+    event = await db['events'].find_one({'title': title})
     if not event:
         await interaction.response.send_message("Event not found!", ephemeral=True)
         return
 
-    embed = discord.Embed(title=f":calendar_spiral: {event['title']}", color=discord.Color.blue())
-    embed.add_field(name="UTC Time", value=datetime.fromtimestamp(event['timestamp']).strftime('%d/%m/%Y %H:%M'), inline=False)
-    embed.add_field(name="Local Time", value=f"<t:{event['timestamp']}> (<t:{event['timestamp']}:R>)", inline=False)
-    embed.add_field(name="Tournament", value=event['tour_name'] or "Not specified", inline=True)
-    embed.add_field(name="Group", value=event['group_name'] or "Not specified", inline=True)
-    embed.add_field(name="Round", value=event['round_no'] or "Not specified", inline=True)
-    embed.add_field(name="Channel", value=f"<#{event['channel_id']}>" if event['channel_id'] else "Not specified", inline=False)
-    embed.add_field(name="Team1 Captain", value=bot.get_user(event['captain1_id']).mention if event['captain1_id'] else event['team1'], inline=True)
-    embed.add_field(name="Team2 Captain", value=bot.get_user(event['captain2_id']).mention if event['captain2_id'] else event['team2'], inline=True)
-    embed.add_field(name="Staffs", value=(
-        f":white_small_square: **Judge**: {bot.get_user(event['judge_id']).mention if event['judge_id'] else 'Awaiting selection'}\n"
-        f":white_small_square: **Recorder**: {bot.get_user(event['recorder_id']).mention if event['recorder_id'] else 'Awaiting selection'}"
-    ), inline=False)
-    if event['remarks']:
-        embed.add_field(name="Remarks", value=event['remarks'], inline=False)
-    if event['image_url']:
-        embed.set_image(url=event['image_url'])
-
+    embed = schedule_embed(event)
     await interaction.response.send_message(embed=embed, ephemeral=True)
     await log_action(db, interaction, f"Event {title} viewed by {interaction.user.mention}")
 
@@ -700,6 +1494,7 @@ async def events_show(interaction: discord.Interaction, title: str):
     screenshot9="Screenshot 9 URL"
 )
 @app_commands.autocomplete(event=event_autocomplete)
+@metrics.timed('command')
 async def events_results(
     interaction: discord.Interaction,
     event: str,
@@ -718,34 +1513,34 @@ async def events_results(
     screenshot8: str = None,
     screenshot9: str = None
 ):
-    tour_name_db = interaction.guild.name.replace(" ", "_").lower()
-    db = mongo_client[tour_name_db]
-    config = db['config'].find_one({'guild_id': interaction.guild.id})
+    db = tenants[interaction.guild.id]
+    config = await get_config(db, interaction.guild.id)
     if not config or not any(role.id == config['bot_op_role'] for role in interaction.user.roles):
         await interaction.response.send_message("You don't have permission!", ephemeral=True)
         return
 
-    event_data = db['events'].find_one({'title': event})
-    if not event_data:
-        await interaction.response.send_message("Event not found!", ephemeral=True)
-        return
-
     results_channel = bot.get_channel(config['results_channel'])
     if not results_channel:
         await interaction.response.send_message("Results channel not found!", ephemeral=True)
         return
 
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    event_data = await db['events'].find_one({'title': event})
+    if not event_data:
+        await interaction.followup.send("Event not found!", ephemeral=True)
+        return
+
     embed = discord.Embed(title=f"{event_data['team1']} vs {event_data['team2']}", color=discord.Color.green())
     embed.add_field(name="Local Time", value=f"<t:{event_data['timestamp']}> (<t:{event_data['timestamp']}:R>)", inline=False)
     embed.add_field(name="Tournament", value=event_data['tour_name'] or "Not specified", inline=True)
     embed.add_field(name="Group", value=event_data['group_name'] or "Not specified", inline=True)
     embed.add_field(name="Round", value=event_data['round_no'] or "Not specified", inline=True)
     embed.add_field(name="Channel", value=f"<#{event_data['channel_id']}>" if event_data['channel_id'] else "Not specified", inline=False)
-    embed.add_field(name="Team1 Captain", value=bot.get_user(event_data['captain1_id']).mention if event_data['captain1_id'] else event_data['team1'], inline=True)
-    embed.add_field(name="Team2 Captain", value=bot.get_user(event_data['captain2_id']).mention if event_data['captain2_id'] else event_data['team2'], inline=True)
+    embed.add_field(name="Team1 Captain", value=mention(event_data['captain1_id'], event_data['team1']), inline=True)
+    embed.add_field(name="Team2 Captain", value=mention(event_data['captain2_id'], event_data['team2']), inline=True)
     embed.add_field(name="Staffs", value=(
-        f":white_small_square: **Judge**: {bot.get_user(event_data['judge_id']).mention if event_data['judge_id'] else 'Awaiting selection'}\n"
-        f":white_small_square: **Recorder**: {bot.get_user(event_data['recorder_id']).mention if event_data['recorder_id'] else 'Awaiting selection'}"
+        f":white_small_square: **Judge**: {mention(event_data['judge_id'], 'Awaiting selection')}\n"
+        f":white_small_square: **Recorder**: {mention(event_data['recorder_id'], 'Awaiting selection')}"
     ), inline=False)
     winner = "Team1" if team1_score > team2_score else "Team2" if team2_score > team1_score else "Draw"
     embed.add_field(name="Results", value=(
@@ -759,50 +1554,323 @@ async def events_results(
         embed.set_image(url=screenshot1)
 
     screenshots = [s for s in [screenshot2, screenshot3, screenshot4, screenshot5, screenshot6, screenshot7, screenshot8, screenshot9] if s]
-    if screenshots:
-        await results_channel.send("\n".join(screenshots))
-    await results_channel.send(embed=embed)
-
-    db['results'].insert_one({
-        'event_title': event,
-        'team1_score': team1_score,
-        'team2_score': team2_score,
-        'number_of_matches': number_of_matches,
-        'remarks': remarks,
-        'rec_link': rec_link,
-        'screenshots': [screenshot1] + screenshots if screenshot1 else screenshots,
-        'timestamp': datetime.utcnow()
-    })
-    await log_action(db, interaction, f"Results for {event} submitted by {interaction.user.mention}")
-    await interaction.response.send_message("Results submitted successfully!", ephemeral=True)
+
+    async def post_results():
+        if screenshots:
+            await results_channel.send("\n".join(screenshots))
+        await results_channel.send(embed=embed)
+
+    async def store_result():
+        # The event's latest earlier result, if any, is replaced in the standings
+        previous = await db['results'].find_one(
+            {'$or': [{'event_id': event_data['_id']}, {'event_title': event, 'event_id': None}]},
+            sort=[('timestamp', -1)]
+        )
+        result = {
+            'event_id': event_data['_id'],
+            'event_title': event,
+            'tour_name': event_data['tour_name'],
+            'group_name': event_data['group_name'],
+            'team1': event_data['team1'],
+            'team2': event_data['team2'],
+            'team1_score': team1_score,
+            'team2_score': team2_score,
+            'number_of_matches': number_of_matches,
+            'remarks': remarks,
+            'rec_link': rec_link,
+            'screenshots': [screenshot1] + screenshots if screenshot1 else screenshots,
+            'timestamp': datetime.utcnow()
+        }
+        await db['results'].insert_one(result)
+        await record_result(db, result, previous)
+
+    steps = Steps(metrics, 'events_results', SIDE_EFFECT_CONCURRENCY)
+    await steps.gather(
+        results_post=post_results(),
+        store=store_result(),
+        transcript=log_action(db, interaction, f"Results for {event} submitted by {interaction.user.mention}"),
+    )
+    await interaction.followup.send(steps.report("Results submitted successfully!"), ephemeral=True)
+
+# /standings
+# Embed limits: 1024 characters per field value, 25 fields and 6000 characters in total
+FIELD_CHARS = 1024
+EMBED_FIELDS = 25
+EMBED_CHARS = 6000
+# Left for the footer naming the groups that didn't fit
+STANDINGS_FOOTER_CHARS = 300
+
+# Whole rows only; a table that doesn't fit says how many teams are cut
+def format_standings(rows):
+    lines = [
+        f"{rank}. {row['team']} - {row['points']} pts "
+        f"({row['wins']}W {row['draws']}D {row['losses']}L, {row['map_diff']:+d} maps)"
+        for rank, row in enumerate(rows, start=1)
+    ]
+    value = ""
+    for shown, line in enumerate(lines):
+        more = f"\n...and {len(lines) - shown} more"
+        candidate = f"{value}\n{line}" if value else line
+        if len(candidate) + (len(more) if shown + 1 < len(lines) else 0) > FIELD_CHARS:
+            return value + more
+        value = candidate
+    return value
+
+@tournament.command(name="standings", description="Show tournament standings")
+@app_commands.describe(
+    tour_name="Tournament name",
+    group_name="Group name (all groups if omitted)",
+    rebuild="Recompute from all results first (bot operators only)"
+)
+@metrics.timed('command')
+async def standings_show(interaction: discord.Interaction, tour_name: str, group_name: str = None, rebuild: bool = False):
+    db = tenants[interaction.guild.id] if rebuild else read_db(interaction.guild.id, 'standings')
+    config = await get_config(db, interaction.guild.id)
+    if not config:
+        await interaction.response.send_message("Config not set! Use /config_set first.", ephemeral=True)
+        return
+
+    if rebuild:
+        if not any(role.id == config['bot_op_role'] for role in interaction.user.roles):
+            await interaction.response.send_message("You don't have permission!", ephemeral=True)
+            return
+        await rebuild_standings(db)
+
+    rows = await standings(db, tour_name, group_name)
+    if not rows:
+        await interaction.response.send_message("No results recorded for this tournament yet!", ephemeral=True)
+        return
+
+    groups = {}
+    for row in rows:
+        groups.setdefault(row['group_name'], []).append(row)
+    embed = discord.Embed(title=f"Standings: {tour_name}", color=discord.Color.gold())
+    omitted = []
+    budget = EMBED_CHARS - STANDINGS_FOOTER_CHARS - len(embed)
+    for group, group_rows in groups.items():
+        name, value = group or "Not specified", format_standings(group_rows)
+        if omitted or len(embed.fields) == EMBED_FIELDS or len(name) + len(value) > budget:
+            omitted.append(name)
+            continue
+        embed.add_field(name=name, value=value, inline=False)
+        budget -= len(name) + len(value)
+    if omitted:
+        footer = f"{len(omitted)} more groups, view them with group_name: {', '.join(omitted)}"
+        embed.set_footer(text=footer if len(footer) <= STANDINGS_FOOTER_CHARS else footer[:STANDINGS_FOOTER_CHARS - 3] + "...")
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+    await log_action(db, interaction, f"Standings for {tour_name} viewed by {interaction.user.mention}")
 
 # /events list
-@tournament.command(name="events_list", description="List all tournament events")
-async def events_list(interaction: discord.Interaction):
-    tour_name_db = interaction.guild.name.replace(" ", "_").lower()
-    db = mongo_client[tour_name_db]
-    config = db['config'].find_one({'guild_id': interaction.guild.id})
+EVENTS_PAGE_SIZE = 15
+EVENTS_PAGE_SORT = [('timestamp', 1), ('_id', 1)]
+EVENTS_PAGE_PROJECTION = {'title': 1, 'timestamp': 1}
+
+class JumpToPage(discord.ui.Modal, title="Jump to page"):
+    page = discord.ui.TextInput(label="Page number", placeholder="e.g., 3", max_length=6)
+
+    def __init__(self, pager):
+        super().__init__()
+        self.pager = pager
+
+    @metrics.timed('modal', 'events_list_jump')
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            page = min(max(int(self.page.value), 1), self.pager.pages)
+        except ValueError:
+            await interaction.response.send_message("Invalid page number!", ephemeral=True)
+            return
+        await self.pager.fetch(page)
+        await interaction.response.edit_message(embed=self.pager.embed(), view=self.pager)
+
+# Keyset pager over a projected, timestamp-sorted events cursor; only the page on screen is fetched
+class EventPager(discord.ui.View):
+    def __init__(self, collection, query, total):
+        super().__init__(timeout=600)
+        self.collection = collection
+        self.query = query
+        self.total = total
+        self.pages = max(1, -(-total // EVENTS_PAGE_SIZE))
+        self.page = 1
+        self.events = []
+
+    async def fetch(self, page, after=None, before=None):
+        query = dict(self.query)
+        boundary = after or before
+        if boundary:
+            op = '$gt' if after else '$lt'
+            query['$or'] = [
+                {'timestamp': {op: boundary['timestamp']}},
+                {'timestamp': boundary['timestamp'], '_id': {op: boundary['_id']}}
+            ]
+        if before:
+            events = await self.collection.find(
+                query, EVENTS_PAGE_PROJECTION,
+                sort=[(key, -direction) for key, direction in EVENTS_PAGE_SORT], limit=EVENTS_PAGE_SIZE
+            )
+            events.reverse()
+        elif after:
+            events = await self.collection.find(query, EVENTS_PAGE_PROJECTION, sort=EVENTS_PAGE_SORT, limit=EVENTS_PAGE_SIZE)
+        else:
+            # Jumps have no neighbouring page to anchor on, so they skip along the sort index
+            events = await self.collection.find(
+                query, EVENTS_PAGE_PROJECTION,
+                sort=EVENTS_PAGE_SORT, skip=(page - 1) * EVENTS_PAGE_SIZE, limit=EVENTS_PAGE_SIZE
+            )
+        self.page = page
+        self.events = events
+        self.prev_button.disabled = page <= 1
+        self.next_button.disabled = page >= self.pages
+
+    def embed(self):
+        event_list = [f"- {event['title'][:100]} (<t:{event['timestamp']}:R>)" for event in self.events]
+        embed = discord.Embed(
+            title="Tournament Events",
+            description="\n".join(event_list) or "No events on this page.",
+            color=discord.Color.purple()
+        )
+        embed.set_footer(text=f"Page {self.page}/{self.pages} · {self.total} events")
+        return embed
+
+    @discord.ui.button(label="Prev", style=discord.ButtonStyle.secondary)
+    @metrics.timed('button', 'events_list_prev')
+    async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.events:
+            await self.fetch(self.page - 1, before=self.events[0])
+        else:
+            await self.fetch(self.page - 1)
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    @metrics.timed('button', 'events_list_next')
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.events:
+            await self.fetch(self.page + 1, after=self.events[-1])
+        else:
+            await self.fetch(self.page + 1)
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    @discord.ui.button(label="Jump", style=discord.ButtonStyle.primary)
+    @metrics.timed('button', 'events_list_jump')
+    async def jump_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(JumpToPage(self))
+
+@tournament.command(name="events_list", description="List tournament events")
+@app_commands.describe(
+    tour_name="Only events in this tournament",
+    group_name="Only events in this group",
+    round_no="Only events in this round"
+)
+@metrics.timed('command')
+async def events_list(
+    interaction: discord.Interaction,
+    tour_name: str = None,
+    group_name: str = None,
+    round_no: str = None
+):
+    db = read_db(interaction.guild.id, 'events_list')
+    config = await get_config(db, interaction.guild.id)
     if not config:
         await interaction.response.send_message("Config not set! Use /config_set first.", ephemeral=True)
         return
 
-    events = db['events'].find()
-    event_list = [f"- {event['title']} (<t:{event['timestamp']}:R>)" for event in events]
-    if not event_list:
+    query = {}
+    if tour_name:
+        query['tour_name'] = tour_name
+    if group_name:
+        query['group_name'] = group_name
+    if round_no:
+        query['round_no'] = round_no
+
+    total = await db['events'].count_documents(query)
+    if not total:
         await interaction.response.send_message("No events found!", ephemeral=True)
         return
 
-    embed = discord.Embed(title="Tournament Events", description="\n".join(event_list), color=discord.Color.purple())
-    await interaction.response.send_message(embed=embed, ephemeral=True)
+    pager = EventPager(db['events'], query, total)
+    await pager.fetch(1)
+    await interaction.response.send_message(embed=pager.embed(), view=pager, ephemeral=True)
     await log_action(db, interaction, f"Event list viewed by {interaction.user.mention}")
 
-# Log action to transcript channel
+# /export
+EXPORT_BATCH_SIZE = 1000
+
+def export_day(value):
+    parts = value.split('/')
+    return get_timestamp(*parts, 0, 0) if len(parts) == 3 else None
+
+@tournament.command(name="export", description="Export tournament data as a gzipped CSV or JSONL file")
+@app_commands.describe(
+    data="What to export",
+    file_format="File format",
+    tour_name="Only this tournament (events and results)",
+    since="From this date, dd/mm/yyyy (UTC)",
+    until="Through this date, dd/mm/yyyy (UTC)"
+)
+@app_commands.choices(
+    data=[app_commands.Choice(name=name, value=name) for name in EXPORTS],
+    file_format=[app_commands.Choice(name="CSV", value='csv'), app_commands.Choice(name="JSON Lines", value='jsonl')]
+)
+@metrics.timed('command')
+async def export(
+    interaction: discord.Interaction,
+    data: str,
+    file_format: str = 'csv',
+    tour_name: str = None,
+    since: str = None,
+    until: str = None
+):
+    db = read_db(interaction.guild.id, 'export')
+    config = await get_config(db, interaction.guild.id)
+    if not config or not any(role.id == config['bot_op_role'] for role in interaction.user.roles):
+        await interaction.response.send_message("You don't have permission!", ephemeral=True)
+        return
+
+    start = export_day(since) if since else None
+    end = export_day(until) if until else None
+    if (since and start is None) or (until and end is None):
+        await interaction.response.send_message("Invalid date format! Use dd/mm/yyyy.", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    spec = EXPORTS[data]
+    query = export_query(spec, tour_name, start, end + 86400 if end is not None else None)
+    writer = ExportWriter(spec['fields'], file_format)
+    loop = asyncio.get_running_loop()
+    try:
+        async for batch in db[data].find_batches(
+            query, dict.fromkeys(spec['fields'], 1), sort=spec['sort'], batch_size=EXPORT_BATCH_SIZE
+        ):
+            # Encoding and gzip are CPU work; keep them off the event loop
+            await loop.run_in_executor(None, writer.write, batch)
+        size = await loop.run_in_executor(None, writer.finish)
+        if size > interaction.guild.filesize_limit:
+            await interaction.followup.send(
+                f"The export is {size / 1024 / 1024:.1f} MB, over this server's upload limit; narrow it with tour_name or dates!",
+                ephemeral=True
+            )
+            return
+        label = re.sub(r'[^\w-]+', '_', f"{data}-{tour_name}" if tour_name and spec['tour'] else data)
+        filename = f"{label}.{file_format}.gz"
+        await interaction.followup.send(
+            f"Exported {writer.rows} {data} rows.", file=discord.File(writer.file, filename=filename), ephemeral=True
+        )
+    finally:
+        writer.close()
+    await log_action(db, interaction, f"{data.capitalize()} exported by {interaction.user.mention}")
+
+# Log action to transcript channel (queued; see TranscriptLogger)
 async def log_action(db, interaction, message):
-    config = db['config'].find_one({'guild_id': interaction.guild.id})
+    config = await get_config(db, interaction.guild.id)
     if config and config['transcript_channel']:
-        transcript_channel = bot.get_channel(config['transcript_channel'])
-        if transcript_channel:
-            await transcript_channel.send(message)
+        await transcript_logger.log(config['transcript_channel'], message)
 
 # Run bot
-bot.run(DISCORD_TOKEN)
+def main():
+    wire()
+    bot.run(DISCORD_TOKEN)
+    # bot.close() has drained the registration queue and transcript log by now
+    renderer.close()
+    mongo.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+
+
+# Syncs the application command tree only when it changed. The serialized tree
+# is hashed and compared with the hash stored after the last successful sync,
+# so restarts and gateway reconnects skip the rate-limited sync call entirely.
+class CommandSync:
+    def __init__(self, tree, collection):
+        self.tree = tree
+        self.collection = collection
+        self.checked = set()
+
+    def tree_hash(self, guild=None):
+        payload = [command.to_dict(self.tree) for command in self.tree.get_commands(guild=guild)]
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _key(self, guild):
+        return f"{self.tree.client.application_id}:{guild.id if guild else 'global'}"
+
+    # Returns the synced commands, or None when the stored hash already matches
+    async def sync(self, guild=None, force=False):
+        key = self._key(guild)
+        # Reconnects fire on_ready again; one check per target per process is enough
+        if key in self.checked:
+            return None
+        if guild is not None:
+            self.tree.copy_global_to(guild=guild)
+        digest = self.tree_hash(guild)
+        stored = await self.collection.find_one({'_id': key})
+        if stored and stored.get('hash') == digest and not force:
+            self.checked.add(key)
+            return None
+        synced = await self.tree.sync(guild=guild)
+        await self.collection.update_one(
+            {'_id': key},
+            {'$set': {'hash': digest, 'commands': len(synced), 'synced_at': datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        self.checked.add(key)
+        return synced
@@ -0,0 +1,94 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+from tempfile import SpooledTemporaryFile
+from bson import ObjectId
+
+# Exports are gzipped in memory up to this size, then spill to a temp file
+SPOOL_BYTES = 8 * 1024 * 1024
+
+# Exported fields per collection (the cursor projection, so guild_id and
+# anything else internal never leaves Mongo), plus the fields the tour_name
+# and date filters apply to. Event timestamps are epoch seconds of the match;
+# the others are naive UTC datetimes of submission.
+EXPORTS = {
+    'events': {
+        'fields': ['title', 'team1', 'team2', 'timestamp', 'time_str', 'tour_name', 'group_name', 'round_no',
+                   'channel_id', 'captain1_id', 'captain2_id', 'judge_id', 'recorder_id', 'image_url', 'remarks', 'message_id'],
+        'tour': 'tour_name', 'date': 'timestamp', 'epoch': True, 'sort': [('timestamp', 1), ('_id', 1)],
+    },
+    'results': {
+        'fields': ['event_id', 'event_title', 'tour_name', 'group_name', 'team1', 'team2', 'team1_score', 'team2_score',
+                   'number_of_matches', 'remarks', 'rec_link', 'screenshots', 'timestamp'],
+        'tour': 'tour_name', 'date': 'timestamp', 'epoch': False, 'sort': None,
+    },
+    'registrations': {
+        'fields': ['user_id', 'username', 'game_id', 'tournament', 'image', 'timestamp'],
+        'tour': None, 'date': 'timestamp', 'epoch': False, 'sort': None,
+    },
+    'staff': {
+        'fields': ['game_name', 'game_id', 'discord_username', 'discord_tag', 'discord_id', 'timestamp'],
+        'tour': None, 'date': 'timestamp', 'epoch': False, 'sort': None,
+    },
+}
+
+
+# since/until are epoch seconds; until is exclusive
+def export_query(spec, tour_name=None, since=None, until=None):
+    query = {}
+    if tour_name and spec['tour']:
+        query[spec['tour']] = tour_name
+    bounds = {}
+    if since is not None:
+        bounds['$gte'] = since if spec['epoch'] else datetime.utcfromtimestamp(since)
+    if until is not None:
+        bounds['$lt'] = until if spec['epoch'] else datetime.utcfromtimestamp(until)
+    if bounds:
+        query[spec['date']] = bounds
+    return query
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    return value
+
+
+# Rows are encoded, compressed and spooled as they arrive, so only one batch
+# is ever held in memory.
+class ExportWriter:
+    def __init__(self, fields, file_format):
+        self.fields = ['_id', *fields]
+        self.file_format = file_format
+        self.rows = 0
+        self.file = SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        self.gzip = gzip.GzipFile(fileobj=self.file, mode='wb')
+        self.text = io.TextIOWrapper(self.gzip, encoding='utf-8', newline='')
+        if file_format == 'csv':
+            self.csv = csv.writer(self.text)
+            self.csv.writerow(self.fields)
+
+    def write(self, documents):
+        for document in documents:
+            values = [_value(document.get(field)) for field in self.fields]
+            if self.file_format == 'csv':
+                self.csv.writerow([json.dumps(value) if isinstance(value, list) else value for value in values])
+            else:
+                self.text.write(json.dumps(dict(zip(self.fields, values)), default=str) + '\n')
+        self.rows += len(documents)
+
+    # Completes the gzip stream and rewinds; returns the compressed size
+    def finish(self):
+        self.text.flush()
+        self.text.detach()
+        self.gzip.close()
+        size = self.file.tell()
+        self.file.seek(0)
+        return size
+
+    def close(self):
+        self.file.close()
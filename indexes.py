@@ -0,0 +1,103 @@
+# Index definitions for the shared tenant collections, as (keys, options) pairs.
+# Every query is scoped to a guild, so every index leads with guild_id.
+INDEXES = {
+    'events': [
+        ([('guild_id', 1), ('title', 1)], {}),
+        ([('guild_id', 1), ('message_id', 1)], {}),
+        ([('guild_id', 1), ('judge_id', 1)], {}),
+        ([('guild_id', 1), ('recorder_id', 1)], {}),
+        ([('guild_id', 1), ('timestamp', 1), ('_id', 1)], {}),
+        ([('guild_id', 1), ('tour_name', 1), ('group_name', 1), ('round_no', 1), ('timestamp', 1), ('_id', 1)], {}),
+    ],
+    'results': [
+        ([('guild_id', 1), ('event_title', 1)], {}),
+        ([('guild_id', 1), ('event_id', 1), ('timestamp', -1)], {}),
+    ],
+    # One row per team per tournament group, read in table order
+    'standings': [
+        ([('guild_id', 1), ('tour_name', 1), ('group_name', 1), ('team', 1)], {'unique': True}),
+        ([('guild_id', 1), ('tour_name', 1), ('group_name', 1), ('points', -1), ('map_diff', -1), ('wins', -1), ('team', 1)], {}),
+    ],
+    # One registration per user and per game ID in each tournament (registration
+    # post) of a guild. Registrations from before tournament_key aren't covered.
+    'registrations': [
+        ([('guild_id', 1), ('tournament_key', 1), ('user_id', 1)],
+         {'unique': True, 'partialFilterExpression': {'tournament_key': {'$exists': True}}}),
+        ([('guild_id', 1), ('tournament_key', 1), ('game_id', 1)],
+         {'unique': True, 'partialFilterExpression': {'tournament_key': {'$exists': True}}}),
+    ],
+    'staff': [
+        ([('guild_id', 1), ('discord_id', 1)], {}),
+    ],
+    'config': [
+        ([('guild_id', 1)], {'unique': True}),
+    ],
+    'staff_stats': [
+        ([('guild_id', 1), ('user_id', 1)], {'unique': True}),
+        ([('guild_id', 1), ('total', -1), ('user_id', 1)], {}),
+    ],
+}
+
+# Representative filters for the queries the handlers issue, checked with explain()
+PROBE_QUERIES = {
+    'events': [
+        {'guild_id': 0, 'title': ''},
+        {'guild_id': 0, 'message_id': 0},
+        {'guild_id': 0, 'judge_id': 0},
+        {'guild_id': 0, 'recorder_id': 0},
+        {'guild_id': 0, 'timestamp': {'$gte': 0}},
+        {'guild_id': 0, 'tour_name': '', 'group_name': '', 'round_no': ''},
+    ],
+    'results': [{'guild_id': 0, 'event_title': ''}, {'guild_id': 0, 'event_id': 0}],
+    'standings': [{'guild_id': 0, 'tour_name': '', 'group_name': ''}, {'guild_id': 0, 'tour_name': ''}],
+    'registrations': [
+        {'guild_id': 0, 'tournament_key': '', 'user_id': 0},
+        {'guild_id': 0, 'tournament_key': '', 'game_id': ''},
+    ],
+    'staff': [{'guild_id': 0, 'discord_id': ''}],
+    'config': [{'guild_id': 0}],
+    'staff_stats': [{'guild_id': 0, 'user_id': 0}, {'guild_id': 0, 'total': {'$gt': 0}}],
+}
+
+
+def _stages(plan):
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _stages(value)
+
+
+async def ensure_indexes(db):
+    problems = []
+    for collection_name, indexes in INDEXES.items():
+        collection = db[collection_name]
+        for keys, options in indexes:
+            try:
+                await collection.create_index(keys, **options)
+            except Exception as e:
+                problems.append(f"{db.name}.{collection_name}: could not create {keys}: {e}")
+        existing = {tuple(info['key']) for info in (await collection.index_information()).values()}
+        for keys, _ in indexes:
+            if tuple(keys) not in existing:
+                problems.append(f"{db.name}.{collection_name}: index {keys} missing")
+    return problems
+
+
+async def find_collection_scans(db):
+    scans = []
+    for collection_name, filters in PROBE_QUERIES.items():
+        for query in filters:
+            plan = await db[collection_name].explain(query)
+            if 'COLLSCAN' in set(_stages(plan.get('queryPlanner', {}).get('winningPlan', {}))):
+                scans.append(f"{db.name}.{collection_name}: {query} uses a collection scan")
+    return scans
+
+
+async def provision(db):
+    problems = await ensure_indexes(db)
+    problems += await find_collection_scans(db)
+    return problems
@@ -0,0 +1,144 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from dotenv import load_dotenv
+
+# Runs bot.py as several OS processes, each owning a contiguous range of shards
+# with its own Mongo client, render pool, card cache directory, registration
+# journal and metrics port.
+# Crashed processes are restarted with exponential backoff.
+#
+#   SHARD_COUNT=8 SHARD_PROCESSES=4 python launcher.py
+
+load_dotenv()
+DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
+SHARD_COUNT = os.getenv('SHARD_COUNT', 'auto').strip().lower()
+SHARD_PROCESSES = int(os.getenv('SHARD_PROCESSES', '0')) or os.cpu_count() or 1
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9108'))
+RENDER_CACHE_DIR = os.getenv('RENDER_CACHE_DIR', 'cache/cards')
+REGISTRATION_JOURNAL_DIR = os.path.dirname(os.getenv('REGISTRATION_JOURNAL', 'cache/registrations.jsonl'))
+BOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bot.py')
+
+# Discord allows one IDENTIFY per 5 seconds per bucket; processes start staggered
+# so their shards don't compete for it
+IDENTIFY_INTERVAL = 5
+# A process that stays up this long has its restart backoff reset
+STABLE_AFTER = 60
+MAX_BACKOFF = 60
+SHUTDOWN_TIMEOUT = 30
+
+
+def recommended_shards():
+    request = urllib.request.Request(
+        'https://discord.com/api/v10/gateway/bot',
+        headers={'Authorization': f'Bot {DISCORD_TOKEN}', 'User-Agent': 'DiscordBot (launcher, 1.0)'}
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)['shards']
+
+
+def shard_ranges(shard_count, processes):
+    processes = max(1, min(processes, shard_count))
+    size, extra = divmod(shard_count, processes)
+    ranges, start = [], 0
+    for i in range(processes):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+class ShardProcess:
+    def __init__(self, index, shard_ids, shard_count, render_workers):
+        self.index = index
+        self.shard_ids = shard_ids
+        self.env = dict(
+            os.environ,
+            SHARD_COUNT=str(shard_count),
+            SHARD_IDS=','.join(map(str, shard_ids)),
+            METRICS_PORT=str(METRICS_PORT + index if METRICS_PORT else 0),
+            RENDER_CACHE_DIR=os.path.join(RENDER_CACHE_DIR, f'process-{index}'),
+            REGISTRATION_JOURNAL=os.path.join(REGISTRATION_JOURNAL_DIR, f'registrations-{index}.jsonl'),
+        )
+        self.env.setdefault('RENDER_WORKERS', str(render_workers))
+        self.process = None
+        self.started = 0.0
+        self.failures = 0
+        self.restart_at = 0.0
+
+    def start(self):
+        print(f'Starting process {self.index} for shards {self.shard_ids[0]}-{self.shard_ids[-1]}')
+        self.process = subprocess.Popen([sys.executable, BOT_PATH], env=self.env)
+        self.started = time.monotonic()
+
+    def check(self):
+        now = time.monotonic()
+        if self.process is None:
+            if now >= self.restart_at:
+                self.start()
+            return
+        code = self.process.poll()
+        if code is None:
+            return
+        self.failures = 0 if now - self.started >= STABLE_AFTER else self.failures + 1
+        delay = min(MAX_BACKOFF, 2 ** self.failures) if self.failures else IDENTIFY_INTERVAL
+        print(f'Process {self.index} exited with code {code}; restarting in {delay}s')
+        self.process = None
+        self.restart_at = now + delay
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            # SIGINT lets bot.run close the gateway and drain the transcript logger
+            self.process.send_signal(signal.SIGINT)
+
+    def wait(self, deadline):
+        if self.process is None:
+            return
+        try:
+            self.process.wait(timeout=max(0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            print(f'Process {self.index} did not stop in time; killing it')
+            self.process.kill()
+            self.process.wait()
+
+
+def main():
+    shard_count = recommended_shards() if SHARD_COUNT == 'auto' else int(SHARD_COUNT)
+    ranges = shard_ranges(shard_count, SHARD_PROCESSES)
+    render_workers = max(1, (os.cpu_count() or 1) // len(ranges))
+    processes = [ShardProcess(i, shard_ids, shard_count, render_workers) for i, shard_ids in enumerate(ranges)]
+    print(f'Running {shard_count} shard(s) across {len(processes)} process(es)')
+
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    start_at = time.monotonic()
+    for process in processes:
+        process.restart_at = start_at
+        start_at += IDENTIFY_INTERVAL * len(process.shard_ids)
+
+    while not stopping:
+        for process in processes:
+            process.check()
+        time.sleep(1)
+
+    print('Stopping shard processes')
+    for process in processes:
+        process.stop()
+    deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+    for process in processes:
+        process.wait(deadline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+import asyncio
+import bisect
+import functools
+import threading
+import time
+from pymongo import monitoring
+
+# Histogram bucket upper bounds in seconds, Prometheus' defaults
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    # Estimated the way Prometheus' histogram_quantile does: linear within the bucket
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if i == len(BUCKETS):
+                    return BUCKETS[-1]
+                lower = BUCKETS[i - 1] if i else 0.0
+                return lower + (BUCKETS[i] - lower) * (rank - seen) / count
+            seen += count
+        return BUCKETS[-1]
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+# Process-wide histograms keyed by (name, labels). Observations
+# arrive from the event loop and from pymongo's worker threads, hence the lock.
+class Metrics:
+    def __init__(self, prefix='tourbot'):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.histograms = {}
+
+    def observe(self, metric, value, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    # Times an interaction callback (command, button, modal or autocomplete)
+    def timed(self, kind, name=None):
+        def decorator(func):
+            label = name or func.__name__
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                status = 'error'
+                try:
+                    result = await func(*args, **kwargs)
+                    status = 'ok'
+                    return result
+                finally:
+                    self.observe('interaction_seconds', time.perf_counter() - started, kind=kind, name=label, status=status)
+            return wrapper
+        return decorator
+
+    # Wraps discord.py's HTTPClient.request, or the webhook adapter's request that
+    # interaction responses and followups go through, so every REST call is
+    # timed per route
+    def time_requests(self, request):
+        @functools.wraps(request)
+        async def wrapper(route, *args, **kwargs):
+            started = time.perf_counter()
+            status = 'error'
+            try:
+                result = await request(route, *args, **kwargs)
+                status = 'ok'
+                return result
+            finally:
+                self.observe(
+                    'discord_request_seconds', time.perf_counter() - started,
+                    method=route.method, route=route.path, status=status
+                )
+        return wrapper
+
+    def snapshot(self, metric):
+        with self.lock:
+            return [
+                (dict(labels), histogram.count, histogram.sum, histogram.quantile(0.5), histogram.quantile(0.99))
+                for (name, labels), histogram in self.histograms.items() if name == metric
+            ]
+
+    def render(self):
+        lines = []
+        with self.lock:
+            histograms = sorted(
+                ((key, list(histogram.counts), histogram.sum, histogram.count) for key, histogram in self.histograms.items()),
+                key=lambda item: item[0]
+            )
+        for name in sorted({name for (name, _), *_ in histograms}):
+            lines.append(f'# TYPE {self.prefix}_{name} histogram')
+            for (metric, labels), counts, total, count in histograms:
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket in zip(BUCKETS + ('+Inf',), counts):
+                    cumulative += bucket
+                    lines.append(f'{self.prefix}_{name}_bucket{_labels(labels + (("le", bound),))} {cumulative}')
+                lines.append(f'{self.prefix}_{name}_sum{_labels(labels)} {total}')
+                lines.append(f'{self.prefix}_{name}_count{_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+    # Minimal HTTP endpoint for Prometheus scrapes: GET /metrics, nothing else
+    async def serve(self, host, port):
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readline(), 5)
+            while await asyncio.wait_for(reader.readline(), 5) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request.split()
+            if len(parts) >= 2 and parts[0] == b'GET' and parts[1].split(b'?')[0] == b'/metrics':
+                status, body = '200 OK', self.render().encode()
+            else:
+                status, body = '404 Not Found', b'Not Found\n'
+            writer.write(
+                f'HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4\r\n'
+                f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+# Counts and times every command pymongo sends, on whichever thread sent it
+class MongoCommandListener(monitoring.CommandListener):
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.metrics.observe('mongo_command_seconds', event.duration_micros / 1e6, command=event.command_name, status='ok')
+
+    def failed(self, event):
+        self.metrics.observe('mongo_command_seconds', event.duration_micros / 1e6, command=event.command_name, status='error')
@@ -0,0 +1,168 @@
+import argparse
+import os
+import time
+import pymongo
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+from dotenv import load_dotenv
+from indexes import INDEXES
+
+# Copies the legacy one-database-per-guild-name layout into the shared tenant
+# collections, stamping every document with its guild_id. The guild_id comes
+# from each database's config document (or --map name=guild_id), so databases
+# orphaned by a guild rename are folded back into the right tenant.
+#
+# Safe to run while the bot is serving: sources are only read, batches are
+# unordered idempotent upserts, and progress is checkpointed per collection
+# so an interrupted run resumes where it stopped.
+#
+#   python migrate_tenants.py --dry-run
+#   python migrate_tenants.py --batch-size 1000 --pause 0.05
+#   python migrate_tenants.py --restart   # final pass after the old bot stops
+#   python migrate_tenants.py --verify
+
+load_dotenv()
+MONGODB_URI = os.getenv('MONGODB_URI')
+MONGO_DATABASE = os.getenv('MONGO_DATABASE', 'tourbot')
+SYSTEM_DATABASES = {'admin', 'local', 'config'}
+CHECKPOINTS = 'tenant_migrations'
+DUPLICATE_KEY = 11000
+
+
+def guild_id_for(database, mapping):
+    if database.name in mapping:
+        return mapping[database.name]
+    config = database['config'].find_one({'guild_id': {'$exists': True}}, {'guild_id': 1})
+    return config['guild_id'] if config else None
+
+
+def source_databases(client, only):
+    for name in sorted(client.list_database_names()):
+        if name in SYSTEM_DATABASES or name == MONGO_DATABASE:
+            continue
+        if only and name not in only:
+            continue
+        yield client[name]
+
+
+def write_batch(target, batch):
+    try:
+        target.bulk_write(batch, ordered=False)
+        return 0
+    except BulkWriteError as e:
+        # Another tenant's _id, or a second config for a guild that already has
+        # one: reported, never overwritten
+        errors = e.details.get('writeErrors', [])
+        if any(error['code'] != DUPLICATE_KEY for error in errors):
+            raise
+        return len(errors)
+
+
+def copy_collection(source, target, checkpoints, guild_id, args):
+    key = {'database': source.database.name, 'collection': source.name}
+    state = None if args.restart else checkpoints.find_one(key)
+    if state and state.get('done'):
+        return 0, 0
+    query = {'_id': {'$gt': state['last_id']}} if state else {}
+    copied = conflicts = 0
+    batch = []
+    last_id = None
+
+    def flush():
+        nonlocal conflicts
+        conflicts += write_batch(target, batch)
+        checkpoints.update_one(
+            key, {'$set': {'guild_id': guild_id, 'last_id': last_id, 'done': False}, '$inc': {'copied': len(batch)}},
+            upsert=True
+        )
+        batch.clear()
+        if args.pause:
+            time.sleep(args.pause)
+
+    for document in source.find(query, sort=[('_id', 1)], batch_size=args.batch_size):
+        document['guild_id'] = guild_id
+        batch.append(ReplaceOne({'_id': document['_id'], 'guild_id': guild_id}, document, upsert=True))
+        last_id = document['_id']
+        copied += 1
+        if len(batch) >= args.batch_size:
+            flush()
+    if batch:
+        flush()
+    checkpoints.update_one(key, {'$set': {'guild_id': guild_id, 'done': True}}, upsert=True)
+    return copied, conflicts
+
+
+def migrate(client, args):
+    shared = client[MONGO_DATABASE]
+    checkpoints = shared[CHECKPOINTS]
+    if args.restart:
+        checkpoints.delete_many({'database': {'$in': [database.name for database in source_databases(client, args.only)]}})
+    if not args.dry_run:
+        for collection_name, indexes in INDEXES.items():
+            for keys, options in indexes:
+                shared[collection_name].create_index(keys, **options)
+
+    for database in source_databases(client, args.only):
+        guild_id = guild_id_for(database, args.map)
+        if guild_id is None:
+            print(f'{database.name}: no config document and no --map entry, skipped')
+            continue
+        for collection_name in sorted(database.list_collection_names()):
+            source = database[collection_name]
+            if args.dry_run:
+                print(f'{database.name}.{collection_name} -> {MONGO_DATABASE}.{collection_name} '
+                      f'guild_id={guild_id}: {source.estimated_document_count()} documents')
+                continue
+            started = time.perf_counter()
+            copied, conflicts = copy_collection(source, shared[collection_name], checkpoints, guild_id, args)
+            print(f'{database.name}.{collection_name} -> guild_id={guild_id}: {copied} copied, '
+                  f'{conflicts} conflicts in {time.perf_counter() - started:.1f}s')
+
+
+def verify(client, args):
+    shared = client[MONGO_DATABASE]
+    expected = {}
+    for database in source_databases(client, args.only):
+        guild_id = guild_id_for(database, args.map)
+        if guild_id is None:
+            continue
+        for collection_name in database.list_collection_names():
+            key = (guild_id, collection_name)
+            expected[key] = expected.get(key, 0) + database[collection_name].count_documents({})
+            if collection_name == 'config':
+                # One config per guild; extras from renamed databases are conflicts by design
+                expected[key] = min(expected[key], 1)
+    mismatches = 0
+    for (guild_id, collection_name), count in sorted(expected.items(), key=str):
+        actual = shared[collection_name].count_documents({'guild_id': guild_id})
+        if actual < count:
+            mismatches += 1
+            print(f'guild_id={guild_id} {collection_name}: {count} in source databases, {actual} in {MONGO_DATABASE}')
+    print(f'{len(expected) - mismatches}/{len(expected)} tenant collections fully copied')
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--pause', type=float, default=0.0, help='seconds to sleep between batches')
+    parser.add_argument('--only', default='', help='comma-separated source database names')
+    parser.add_argument('--map', action='append', default=[], help='name=guild_id for databases without a config')
+    parser.add_argument('--restart', action='store_true', help='ignore checkpoints and copy everything again')
+    parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('--verify', action='store_true', help='compare per-tenant document counts and exit')
+    args = parser.parse_args()
+    args.only = {name for name in args.only.split(',') if name}
+    args.map = {name: int(guild_id) for name, guild_id in (entry.split('=', 1) for entry in args.map)}
+
+    client = pymongo.MongoClient(MONGODB_URI)
+    try:
+        if args.verify:
+            raise SystemExit(1 if verify(client, args) else 0)
+        migrate(client, args)
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
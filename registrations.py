@@ -0,0 +1,149 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+
+_STOP = object()
+MAX_RETRY_DELAY = 30.0
+MAX_ATTEMPTS = 6
+
+
+# Write-behind buffer for registration submits. submit() journals the record
+# and queues it without touching Mongo or Discord, so the modal can be
+# acknowledged at once; a single background task hands batches of up to
+# max_batch records per guild to `flush`.
+#
+# Every queued record is first appended to a local journal, which is replayed
+# on start and truncated whenever everything journaled has been flushed, so a
+# crash between the acknowledgement and the flush loses nothing. Replays rely
+# on the unique registration indexes to drop records that had already landed.
+# A batch that still fails after MAX_ATTEMPTS is moved to a dead-letter file
+# next to the journal instead of stalling the queue.
+class RegistrationQueue:
+    def __init__(self, flush, journal_path, max_queue=1000, max_batch=100, flush_interval=1.0, failed=None):
+        self.flush = flush
+        self.failed = failed
+        self.journal_path = journal_path
+        self.dead_letter_path = os.path.splitext(journal_path)[0] + '.failed.jsonl'
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.pending = set()
+        self.unflushed = 0
+        self.journal = None
+        self.replayed = []
+        self.task = None
+        self.flushed = 0
+        self.batches = 0
+
+    def start(self):
+        if self.task is not None:
+            return
+        os.makedirs(os.path.dirname(self.journal_path) or '.', exist_ok=True)
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final line from a crash mid-write
+                        continue
+                    record['timestamp'] = datetime.fromisoformat(record['timestamp'])
+                    self.replayed.append((record, None))
+        self.unflushed = len(self.replayed)
+        self.journal = open(self.journal_path, 'a')
+        self.task = asyncio.create_task(self._run())
+
+    @staticmethod
+    def _keys(record):
+        tournament = (record['guild_id'], record.get('tournament_key'))
+        return (*tournament, 'user', record['user_id']), (*tournament, 'game', record['game_id'])
+
+    @staticmethod
+    def _encode(record):
+        return json.dumps({**record, 'timestamp': record['timestamp'].isoformat()}) + '\n'
+
+    # Returns False when the same user or game ID is already waiting to be
+    # flushed. Raises asyncio.QueueFull when the buffer is at capacity.
+    def submit(self, record, interaction=None):
+        keys = self._keys(record)
+        if any(key in self.pending for key in keys):
+            return False
+        if self.queue.full():
+            raise asyncio.QueueFull
+        self.journal.write(self._encode(record))
+        self.journal.flush()
+        self.pending.update(keys)
+        self.unflushed += 1
+        self.queue.put_nowait((record, interaction))
+        return True
+
+    async def close(self, timeout=10.0):
+        if self.task is None:
+            return
+        await self.queue.put(_STOP)
+        try:
+            await asyncio.wait_for(self.task, timeout)
+        except asyncio.TimeoutError:
+            print(f'Registration queue did not drain within {timeout}s; the journal keeps the rest')
+            self.task.cancel()
+        self.task = None
+        self.journal.close()
+        self.journal = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while self.replayed:
+            batch, self.replayed = self.replayed[:self.max_batch], self.replayed[self.max_batch:]
+            await self._flush(batch)
+        while not stopping:
+            item = await self.queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        by_guild = {}
+        for record, interaction in batch:
+            by_guild.setdefault(record['guild_id'], []).append((record, interaction))
+        for guild_id, items in by_guild.items():
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                try:
+                    await self.flush(guild_id, items)
+                    break
+                except Exception as e:
+                    if attempt == MAX_ATTEMPTS:
+                        print(f'Giving up on {len(items)} registrations for {guild_id}, see {self.dead_letter_path}: {e}')
+                        self._dead_letter(items)
+                        if self.failed is not None:
+                            await self.failed(guild_id, items)
+                        break
+                    # Still journaled, so retrying in memory is safe; flush
+                    # recognizes records from a write that did land
+                    delay = min(MAX_RETRY_DELAY, 2 ** attempt)
+                    print(f'Error flushing {len(items)} registrations for {guild_id}, retrying in {delay}s: {e}')
+                    await asyncio.sleep(delay)
+        for record, _ in batch:
+            self.pending.difference_update(self._keys(record))
+        self.unflushed -= len(batch)
+        self.flushed += len(batch)
+        self.batches += 1
+        if not self.unflushed and self.journal is not None:
+            self.journal.truncate(0)
+
+    def _dead_letter(self, items):
+        with open(self.dead_letter_path, 'a') as f:
+            for record, _ in items:
+                f.write(self._encode(record))
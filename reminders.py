@@ -0,0 +1,104 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+# Upper bound on a single sleep, so wall-clock drift against the loop's
+# monotonic clock is corrected at least this often
+MAX_SLEEP = 60.0
+
+
+# Pre-match reminders for every upcoming event, held in one min-heap and
+# drained by a single sleeping task. Each event's reminders share a version;
+# rescheduling or cancelling bumps it, and heap entries carrying an old
+# version are discarded lazily when they reach the top.
+class ReminderScheduler:
+    def __init__(self, fire, offsets, clock=time.time):
+        self.fire = fire
+        self.offsets = sorted(set(offsets), reverse=True)
+        self.clock = clock
+        self.heap = []
+        self.events = {}
+        self.versions = itertools.count()
+        self.wakeup = asyncio.Event()
+        self.task = None
+        self.live = 0
+        self.sent = 0
+
+    def __len__(self):
+        return len(self.events)
+
+    def schedule(self, guild_id, event):
+        key = (guild_id, event['_id'])
+        now = self.clock()
+        timestamp = event['timestamp']
+        sent = set(event.get('reminders_sent') or ())
+        pending = [offset for offset in self.offsets if offset not in sent and now < timestamp]
+        upcoming = [offset for offset in pending if timestamp - offset > now]
+        overdue = [offset for offset in pending if timestamp - offset <= now]
+        # Reminders missed while offline collapse into the most recent one
+        if overdue:
+            upcoming.append(min(overdue))
+        self.cancel(*key)
+        if not upcoming:
+            return
+
+        version = next(self.versions)
+        self.events[key] = [version, len(upcoming)]
+        self.live += len(upcoming)
+        for offset in upcoming:
+            heapq.heappush(self.heap, (max(now, timestamp - offset), version, key, offset))
+        if len(self.heap) > 2 * self.live + 64:
+            self._compact()
+        self.wakeup.set()
+
+    def cancel(self, guild_id, event_id):
+        state = self.events.pop((guild_id, event_id), None)
+        if state:
+            self.live -= state[1]
+
+    def _is_live(self, entry):
+        state = self.events.get(entry[2])
+        return state is not None and state[0] == entry[1]
+
+    def _compact(self):
+        self.heap = [entry for entry in self.heap if self._is_live(entry)]
+        heapq.heapify(self.heap)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        while True:
+            while self.heap and not self._is_live(self.heap[0]):
+                heapq.heappop(self.heap)
+            delay = self.heap[0][0] - self.clock() if self.heap else MAX_SLEEP
+            if delay > 0:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), min(delay, MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, key, offset = heapq.heappop(self.heap)
+            state = self.events[key]
+            state[1] -= 1
+            self.live -= 1
+            if not state[1]:
+                del self.events[key]
+            try:
+                await self.fire(key[0], key[1], offset)
+                self.sent += 1
+            except Exception as e:
+                print(f'Error sending reminder for {key[1]}: {e}')
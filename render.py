@@ -0,0 +1,266 @@
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+import random
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image, ImageDraw, ImageFont
+
+BG_FILES = ['images/bg1.jpg', 'images/bg2.jpg', 'images/bg3.jpg']
+LOGO_PATH = 'images/logo.png'
+THUMBNAIL_PATH = 'images/thumbnail.png'
+FONT_PATH = 'fonts/arial.ttf'
+CARD_SIZE = (800, 600)
+LOGO_SIZE = (200, 100)
+THUMBNAIL_SIZE = (100, 100)
+# Bump when render_card's output changes for the same inputs
+CARD_VERSION = 1
+
+# Per-process asset cache, filled once by _init_worker (or lazily on first use)
+_assets = {}
+
+
+def _load_overlay(path, size):
+    key = (path, size)
+    if key not in _assets:
+        _assets[key] = Image.open(path).convert('RGBA').resize(size) if path and os.path.exists(path) else None
+    return _assets[key]
+
+
+def _init_worker():
+    _assets['font'] = ImageFont.truetype(FONT_PATH, 40)
+    _assets['backgrounds'] = {path: Image.open(path).convert('RGBA').resize(CARD_SIZE) for path in BG_FILES}
+    _load_overlay(LOGO_PATH, LOGO_SIZE)
+    _load_overlay(THUMBNAIL_PATH, THUMBNAIL_SIZE)
+
+
+def pick_background(title):
+    # Stable per event so re-renders of the same event hit the card cache
+    return BG_FILES[zlib.crc32(title.encode()) % len(BG_FILES)]
+
+
+def render_card(team1, team2, time_str, logo_path=LOGO_PATH, thumbnail_path=THUMBNAIL_PATH, background=None):
+    if 'font' not in _assets:
+        _init_worker()
+    base_image = _assets['backgrounds'][background or random.choice(BG_FILES)].copy()
+    draw = ImageDraw.Draw(base_image)
+    font = _assets['font']
+
+    logo = _load_overlay(logo_path, LOGO_SIZE)
+    if logo:
+        base_image.paste(logo, (300, 20), logo)
+
+    vs_text = f"{team1} VS {team2}"
+    draw.text((base_image.width // 2 - 100, base_image.height // 2), vs_text, fill='white', font=font)
+
+    draw.text((50, base_image.height - 50), time_str, fill='white', font=font)
+
+    thumbnail = _load_overlay(thumbnail_path, THUMBNAIL_SIZE)
+    if thumbnail:
+        base_image.paste(thumbnail, (base_image.width - 120, base_image.height - 120), thumbnail)
+
+    # The card is opaque, so drop alpha; fast zlib level since encoding dominated render time
+    buffer = io.BytesIO()
+    base_image.convert('RGB').save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def _digest_files(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.encode())
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+# Content-addressed store for rendered cards: a byte-bounded in-memory LRU in
+# front of a size-capped on-disk LRU. Keys hash every input of render_card.
+class CardCache:
+    def __init__(self, directory, memory_bytes=32 * 1024 * 1024, disk_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.memory = OrderedDict()
+        self.memory_size = 0
+        self.disk = OrderedDict()
+        self.disk_size = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.asset_digest = _digest_files(BG_FILES + [LOGO_PATH, THUMBNAIL_PATH, FONT_PATH])
+        os.makedirs(directory, exist_ok=True)
+        # Rebuild the disk LRU order from modification times (touched on every hit)
+        entries = []
+        for name in os.listdir(directory):
+            if name.endswith('.png'):
+                stat = os.stat(os.path.join(directory, name))
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self.disk[key] = size
+            self.disk_size += size
+
+    def key(self, team1, team2, time_str, logo_path, thumbnail_path, background):
+        digest = hashlib.sha256()
+        for part in (CARD_VERSION, self.asset_digest, team1, team2, time_str, logo_path, thumbnail_path, background):
+            digest.update(repr(part).encode())
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.png')
+
+    def _remember(self, key, data):
+        if len(data) > self.memory_bytes:
+            return
+        if key in self.memory:
+            self.memory_size -= len(self.memory.pop(key))
+        self.memory[key] = data
+        self.memory_size += len(data)
+        while self.memory_size > self.memory_bytes:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_size -= len(evicted)
+
+    def _read(self, key):
+        path = self._path(key)
+        with open(path, 'rb') as f:
+            data = f.read()
+        os.utime(path)
+        return data
+
+    def _write(self, key, data, evicted):
+        path = self._path(key)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except FileNotFoundError:
+                pass
+
+    async def get(self, key):
+        data = self.memory.get(key)
+        if data is not None:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+            return data
+        if key in self.disk:
+            loop = asyncio.get_running_loop()
+            try:
+                data = await loop.run_in_executor(None, self._read, key)
+            except FileNotFoundError:
+                self.disk_size -= self.disk.pop(key, 0)
+            else:
+                self.disk.move_to_end(key)
+                self.disk_hits += 1
+                self._remember(key, data)
+                return data
+        self.misses += 1
+        return None
+
+    async def put(self, key, data):
+        self._remember(key, data)
+        if key in self.disk or len(data) > self.disk_bytes:
+            return
+        self.disk[key] = len(data)
+        self.disk_size += len(data)
+        evicted = []
+        while self.disk_size > self.disk_bytes:
+            old_key, size = self.disk.popitem(last=False)
+            self.disk_size -= size
+            evicted.append(old_key)
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._write, key, data, evicted)
+        except OSError:
+            # A failed disk write only costs the disk tier, never the render
+            self.disk_size -= self.disk.pop(key, 0)
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            'memory_entries': len(self.memory),
+            'memory_bytes': self.memory_size,
+            'disk_entries': len(self.disk),
+            'disk_bytes': self.disk_size,
+        }
+
+
+# Renders match cards in a pool of worker processes so CPU-bound Pillow work
+# neither blocks the event loop nor serializes behind the GIL.
+class CardRenderer:
+    def __init__(self, max_workers=None, cache=None, metrics=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache = cache
+        self.metrics = metrics
+        self.executor = None
+        self.in_flight = {}
+
+    def _pool(self):
+        if self.executor is None:
+            # spawn, not fork: the parent already runs pymongo and event loop threads
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            )
+        return self.executor
+
+    async def render(self, team1, team2, time_str, logo_path=LOGO_PATH, thumbnail_path=THUMBNAIL_PATH, background=None):
+        args = (team1, team2, time_str, logo_path, thumbnail_path, background)
+        if self.cache is None or background is None:
+            return io.BytesIO(await self._render(*args))
+
+        key = self.cache.key(*args)
+        data = await self.cache.get(key)
+        if data is None:
+            # Identical renders already under way are shared rather than repeated
+            if key not in self.in_flight:
+                self.in_flight[key] = asyncio.ensure_future(self._render_and_store(key, args))
+            data = await asyncio.shield(self.in_flight[key])
+        return io.BytesIO(data)
+
+    async def _render(self, *args):
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        executor = self._pool()
+        try:
+            data = await loop.run_in_executor(executor, render_card, *args)
+        except BrokenProcessPool as e:
+            # A dead worker (OOM kill, crash, failed initializer) breaks the pool
+            # for good; the next call builds a fresh one, and this render retries
+            # on it once. Concurrent renders that failed with it share the rebuild.
+            print(f'Error in render pool, restarting it: {e}')
+            if self.executor is executor:
+                self.executor = None
+                executor.shutdown(wait=False)
+            data = await loop.run_in_executor(self._pool(), render_card, *args)
+        if self.metrics is not None:
+            self.metrics.observe('render_seconds', time.perf_counter() - started)
+        return data
+
+    async def _render_and_store(self, key, args):
+        try:
+            data = await self._render(*args)
+            await self.cache.put(key, data)
+            return data
+        finally:
+            del self.in_flight[key]
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
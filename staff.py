@@ -0,0 +1,91 @@
+ROLE_FIELDS = {'judge': ('judge_id', 'judged'), 'recorder': ('recorder_id', 'recorded')}
+RECENT_EVENTS = 20
+
+
+def _role_counts(user_id):
+    return {
+        'judged': {'$sum': {'$cond': [{'$eq': ['$judge_id', user_id]}, 1, 0]}},
+        'recorded': {'$sum': {'$cond': [{'$eq': ['$recorder_id', user_id]}, 1, 0]}},
+    }
+
+
+# Everything staff_work shows, computed server-side in one aggregation
+async def staff_stats(db, user_id):
+    pipeline = [
+        {'$match': {'$or': [{'judge_id': user_id}, {'recorder_id': user_id}]}},
+        {'$facet': {
+            'totals': [{'$group': {
+                '_id': None,
+                **_role_counts(user_id),
+                'first': {'$min': '$timestamp'},
+                'last': {'$max': '$timestamp'},
+            }}],
+            'by_tournament': [
+                {'$group': {'_id': '$tour_name', **_role_counts(user_id)}},
+                {'$sort': {'_id': 1}},
+            ],
+            'by_round': [
+                {'$group': {'_id': '$round_no', **_role_counts(user_id)}},
+                {'$sort': {'_id': 1}},
+            ],
+            'recent': [
+                {'$sort': {'timestamp': -1}},
+                {'$limit': RECENT_EVENTS},
+                {'$project': {'_id': 0, 'title': 1, 'timestamp': 1, 'judge_id': 1, 'recorder_id': 1}},
+            ],
+        }},
+    ]
+    result = (await db['events'].aggregate(pipeline))[0]
+    totals = result['totals'][0] if result['totals'] else {'judged': 0, 'recorded': 0, 'first': None, 'last': None}
+    return {
+        'judged': totals['judged'],
+        'recorded': totals['recorded'],
+        'first': totals['first'],
+        'last': totals['last'],
+        'by_tournament': result['by_tournament'],
+        'by_round': result['by_round'],
+        'recent': result['recent'],
+    }
+
+
+# Incremental leaderboard counters in staff_stats, one document per staff member.
+# They track events currently assigned, so a reassignment moves a count from the
+# previous holder to the new one. count folds several assignments into one write.
+async def record_assignment(db, role, previous_id, user_id, count=1):
+    if previous_id == user_id:
+        return
+    _, counter = ROLE_FIELDS[role]
+    if previous_id:
+        await db['staff_stats'].update_one(
+            {'user_id': previous_id}, {'$inc': {counter: -count, 'total': -count}}, upsert=True
+        )
+    if user_id:
+        await db['staff_stats'].update_one(
+            {'user_id': user_id}, {'$inc': {counter: count, 'total': count}}, upsert=True
+        )
+
+
+async def leaderboard(db, limit=10):
+    return await db['staff_stats'].find(
+        {'total': {'$gt': 0}}, {'_id': 0}, sort=[('total', -1), ('user_id', 1)], limit=limit
+    )
+
+
+# Recomputes every counter from events, for repairs and for guilds that
+# predate the counters
+async def rebuild_counters(db):
+    counts = {}
+    for role, (field, counter) in ROLE_FIELDS.items():
+        rows = await db['events'].aggregate([
+            {'$match': {field: {'$ne': None}}},
+            {'$group': {'_id': f'${field}', 'count': {'$sum': 1}}},
+        ])
+        for row in rows:
+            counts.setdefault(row['_id'], {'judged': 0, 'recorded': 0})[counter] = row['count']
+    await db['staff_stats'].delete_many({})
+    if counts:
+        await db['staff_stats'].insert_many([
+            {'user_id': user_id, **values, 'total': values['judged'] + values['recorded']}
+            for user_id, values in counts.items()
+        ])
+    return len(counts)
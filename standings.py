@@ -0,0 +1,90 @@
+POINTS = {'wins': 3, 'draws': 1, 'losses': 0}
+STANDINGS_SORT = [('group_name', 1), ('points', -1), ('map_diff', -1), ('wins', -1), ('team', 1)]
+SNAPSHOT = ('tour_name', 'group_name', 'team1', 'team2')
+COUNTERS = ('played', 'wins', 'draws', 'losses', 'maps_won', 'maps_lost', 'maps_played', 'map_diff', 'points')
+
+
+# Materialized standings, one document per team per tournament group. Each
+# result carries a snapshot of its event's tournament, group and teams, so the
+# table is a pure function of the latest result per event: resubmitting a
+# result replaces that event's contribution, and editing the event afterwards
+# doesn't move points between teams until the result is submitted again.
+def _contributions(result):
+    rows = {}
+    sides = (
+        (result['team1'], result['team1_score'], result['team2_score']),
+        (result['team2'], result['team2_score'], result['team1_score']),
+    )
+    for team, scored, conceded in sides:
+        outcome = 'wins' if scored > conceded else 'losses' if scored < conceded else 'draws'
+        rows[(result.get('tour_name'), result.get('group_name'), team)] = {
+            'played': 1,
+            'wins': int(outcome == 'wins'),
+            'draws': int(outcome == 'draws'),
+            'losses': int(outcome == 'losses'),
+            'maps_won': scored,
+            'maps_lost': conceded,
+            'maps_played': result['number_of_matches'],
+            'map_diff': scored - conceded,
+            'points': POINTS[outcome],
+        }
+    return rows
+
+
+# Applies a newly inserted result, backing out the event's previous result
+async def record_result(db, result, previous=None):
+    deltas = _contributions(result)
+    if previous:
+        # A result from before the snapshot fields counts under the current event,
+        # as it does in a rebuild
+        previous = {**{field: result[field] for field in SNAPSHOT}, **previous}
+        for key, values in _contributions(previous).items():
+            row = deltas.setdefault(key, dict.fromkeys(COUNTERS, 0))
+            for counter, value in values.items():
+                row[counter] -= value
+    for (tour_name, group_name, team), values in deltas.items():
+        await db['standings'].update_one(
+            {'tour_name': tour_name, 'group_name': group_name, 'team': team}, {'$inc': values}, upsert=True
+        )
+
+
+async def standings(db, tour_name, group_name=None):
+    query = {'tour_name': tour_name, 'played': {'$gt': 0}}
+    if group_name:
+        query['group_name'] = group_name
+    return await db['standings'].find(query, {'_id': 0}, sort=STANDINGS_SORT)
+
+
+# Recomputes the table from every event's latest result, for repairs and for
+# results submitted before standings existed
+async def rebuild_standings(db):
+    results = await db['results'].find({}, sort=[('timestamp', 1), ('_id', 1)])
+    legacy = {result['event_title'] for result in results if 'event_id' not in result}
+    by_title = {}
+    if legacy:
+        # Results from before the snapshot fields take them from the current event
+        events = await db['events'].find(
+            {'title': {'$in': list(legacy)}}, {'title': 1, **dict.fromkeys(SNAPSHOT, 1)}
+        )
+        by_title = {event['title']: event for event in events}
+    latest = {}
+    for result in results:
+        if 'event_id' not in result:
+            event = by_title.get(result['event_title'])
+            if not event:
+                continue
+            result.update(event_id=event['_id'], **{field: event.get(field) for field in SNAPSHOT})
+        latest[result['event_id']] = result
+    rows = {}
+    for result in latest.values():
+        for key, values in _contributions(result).items():
+            row = rows.setdefault(key, dict.fromkeys(COUNTERS, 0))
+            for counter, value in values.items():
+                row[counter] += value
+    await db['standings'].delete_many({})
+    if rows:
+        await db['standings'].insert_many([
+            {'tour_name': tour_name, 'group_name': group_name, 'team': team, **values}
+            for (tour_name, group_name, team), values in rows.items()
+        ])
+    return len(rows)
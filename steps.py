@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+
+# Side effects of an already deferred interaction. Each step is timed into
+# step_seconds{command, step, status}; a failing step is printed and recorded
+# in `failed` instead of raising, so the handler can still answer through the
+# followup and say what didn't happen.
+class Steps:
+    def __init__(self, metrics, command, limit=4):
+        self.metrics = metrics
+        self.command = command
+        self.semaphore = asyncio.Semaphore(limit)
+        self.failed = []
+
+    # Returns the step's result, or None if it failed
+    async def run(self, name, step):
+        async with self.semaphore:
+            started = time.perf_counter()
+            status = 'error'
+            try:
+                result = await step
+                status = 'ok'
+                return result
+            except Exception as e:
+                print(f"Error in {self.command} step {name}: {e}")
+                self.failed.append(name)
+                return None
+            finally:
+                self.metrics.observe('step_seconds', time.perf_counter() - started, command=self.command, step=name, status=status)
+
+    # Runs independent steps concurrently, at most `limit` at a time. A step
+    # given as None is skipped.
+    async def gather(self, **steps):
+        return await asyncio.gather(*(self.run(name, step) for name, step in steps.items() if step is not None))
+
+    def report(self, message):
+        if not self.failed:
+            return message
+        return f"{message}\nThese steps failed and may need to be redone: {', '.join(self.failed)}"
@@ -0,0 +1,175 @@
+import asyncio
+import functools
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Async facade over pymongo. Every call runs on a bounded thread pool so a slow
+# Mongo round trip never blocks the event loop (and with it the gateway heartbeat).
+class AsyncMongo:
+    def __init__(self, client, max_workers=16):
+        self.client = client
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='mongo')
+
+    def __getitem__(self, name):
+        return AsyncDatabase(self.client[name], self.executor)
+
+    # A handle with its own read preference/concern, e.g. for secondary reads
+    def database(self, name, **options):
+        return AsyncDatabase(self.client.get_database(name, **options), self.executor)
+
+    async def run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.client.close()
+
+
+# Latest cluster and operation time seen for one causally related stream of
+# operations (the bot uses one per guild). Each operation runs in a short-lived
+# causally consistent session advanced to these times, so a secondary read
+# waits until it has replicated everything this stream wrote before it.
+class CausalClock:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cluster_time = None
+        self.operation_time = None
+
+    def start(self, client):
+        session = client.start_session(causal_consistency=True)
+        with self.lock:
+            if self.cluster_time is not None:
+                session.advance_cluster_time(self.cluster_time)
+            if self.operation_time is not None:
+                session.advance_operation_time(self.operation_time)
+        return session
+
+    def observe(self, session):
+        with self.lock:
+            cluster_time = session.cluster_time
+            if cluster_time is not None and (
+                self.cluster_time is None or cluster_time['clusterTime'] > self.cluster_time['clusterTime']
+            ):
+                self.cluster_time = cluster_time
+            operation_time = session.operation_time
+            if operation_time is not None and (self.operation_time is None or operation_time > self.operation_time):
+                self.operation_time = operation_time
+
+
+class AsyncDatabase:
+    def __init__(self, database, executor, clock=None):
+        self.database = database
+        self.executor = executor
+        self.clock = clock
+        self.name = database.name
+
+    def __getitem__(self, name):
+        return AsyncCollection(self.database[name], self.executor, self.clock)
+
+    def with_clock(self, clock):
+        return AsyncDatabase(self.database, self.executor, clock)
+
+
+class AsyncCollection:
+    def __init__(self, collection, executor, clock=None):
+        self.collection = collection
+        self.executor = executor
+        self.clock = clock
+        self.name = collection.name
+
+    def _call(self, func, *args, **kwargs):
+        if self.clock is None:
+            return func(*args, **kwargs)
+        with self.clock.start(self.collection.database.client) as session:
+            result = func(*args, session=session, **kwargs)
+            self.clock.observe(session)
+            return result
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(self._call, func, *args, **kwargs))
+
+    # Cursors iterate lazily and would hit the network on the loop, so whole
+    # result sets are materialized inside the worker thread.
+    def _find(self, *args, **kwargs):
+        return list(self.collection.find(*args, **kwargs))
+
+    def _aggregate(self, *args, **kwargs):
+        return list(self.collection.aggregate(*args, **kwargs))
+
+    @staticmethod
+    def _next_batch(cursor, batch_size):
+        return list(itertools.islice(cursor, batch_size))
+
+    def _explain(self, *args, **kwargs):
+        return self.collection.find(*args, **kwargs).explain()
+
+    async def find_one(self, *args, **kwargs):
+        return await self._run(self.collection.find_one, *args, **kwargs)
+
+    async def find(self, *args, **kwargs):
+        return await self._run(self._find, *args, **kwargs)
+
+    # For result sets too large to materialize: yields lists of up to batch_size
+    # documents, each pulled from one cursor in a worker thread, so memory stays
+    # bounded by the batch. With a clock, the whole cursor shares one session.
+    async def find_batches(self, *args, batch_size=1000, **kwargs):
+        loop = asyncio.get_running_loop()
+        session = None
+        if self.clock is not None:
+            session = await loop.run_in_executor(self.executor, self.clock.start, self.collection.database.client)
+            kwargs['session'] = session
+        cursor = self.collection.find(*args, batch_size=batch_size, **kwargs)
+        try:
+            while True:
+                batch = await loop.run_in_executor(self.executor, self._next_batch, cursor, batch_size)
+                if not batch:
+                    break
+                yield batch
+        finally:
+            await loop.run_in_executor(self.executor, cursor.close)
+            if session is not None:
+                self.clock.observe(session)
+                session.end_session()
+
+    async def insert_one(self, *args, **kwargs):
+        return await self._run(self.collection.insert_one, *args, **kwargs)
+
+    async def insert_many(self, *args, **kwargs):
+        return await self._run(self.collection.insert_many, *args, **kwargs)
+
+    async def update_one(self, *args, **kwargs):
+        return await self._run(self.collection.update_one, *args, **kwargs)
+
+    async def update_many(self, *args, **kwargs):
+        return await self._run(self.collection.update_many, *args, **kwargs)
+
+    async def delete_one(self, *args, **kwargs):
+        return await self._run(self.collection.delete_one, *args, **kwargs)
+
+    async def delete_many(self, *args, **kwargs):
+        return await self._run(self.collection.delete_many, *args, **kwargs)
+
+    async def find_one_and_update(self, *args, **kwargs):
+        return await self._run(self.collection.find_one_and_update, *args, **kwargs)
+
+    async def count_documents(self, *args, **kwargs):
+        return await self._run(self.collection.count_documents, *args, **kwargs)
+
+    async def aggregate(self, *args, **kwargs):
+        return await self._run(self._aggregate, *args, **kwargs)
+
+    async def bulk_write(self, *args, **kwargs):
+        return await self._run(self.collection.bulk_write, *args, **kwargs)
+
+    async def create_index(self, *args, **kwargs):
+        return await self._run(self.collection.create_index, *args, **kwargs)
+
+    async def index_information(self):
+        return await self._run(self.collection.index_information)
+
+    async def explain(self, *args, **kwargs):
+        return await self._run(self._explain, *args, **kwargs)
@@ -0,0 +1,102 @@
+from storage import CausalClock
+
+
+# Tenant resolution: every guild's data lives in the shared collections of one
+# database, partitioned by guild_id. tenants[guild_id] hands out a database-like
+# view whose collections add the guild_id to every filter, document and pipeline,
+# so handlers keep their queries tenant-agnostic and can't reach another guild.
+#
+# With a separate reader handle (e.g. secondary-preferred), each guild's
+# operations share a CausalClock so reads through the reader still observe
+# that guild's earlier writes.
+class Tenants:
+    def __init__(self, database, reader=None):
+        self.database = database
+        self.reader = reader
+        self.clocks = {}
+
+    def _clock(self, guild_id):
+        clock = self.clocks.get(guild_id)
+        if clock is None:
+            clock = self.clocks[guild_id] = CausalClock()
+        return clock
+
+    def __getitem__(self, guild_id):
+        if self.reader is None:
+            return TenantDatabase(self.database, guild_id)
+        return TenantDatabase(self.database.with_clock(self._clock(guild_id)), guild_id)
+
+    def read(self, guild_id):
+        if self.reader is None:
+            return self[guild_id]
+        return TenantDatabase(self.reader.with_clock(self._clock(guild_id)), guild_id)
+
+
+class TenantDatabase:
+    def __init__(self, database, guild_id):
+        self.database = database
+        self.guild_id = guild_id
+        self.name = f'{database.name}[{guild_id}]'
+
+    def __getitem__(self, name):
+        return TenantCollection(self.database[name], self.guild_id)
+
+
+class TenantCollection:
+    def __init__(self, collection, guild_id):
+        self.collection = collection
+        self.guild_id = guild_id
+        self.name = collection.name
+
+    def _scope(self, filter):
+        return {**(filter or {}), 'guild_id': self.guild_id}
+
+    def _stamp(self, document):
+        # In place, so the caller sees the _id the driver assigns, as with pymongo
+        document['guild_id'] = self.guild_id
+        return document
+
+    async def find_one(self, filter=None, *args, **kwargs):
+        return await self.collection.find_one(self._scope(filter), *args, **kwargs)
+
+    async def find(self, filter=None, *args, **kwargs):
+        return await self.collection.find(self._scope(filter), *args, **kwargs)
+
+    async def find_batches(self, filter=None, *args, **kwargs):
+        async for batch in self.collection.find_batches(self._scope(filter), *args, **kwargs):
+            yield batch
+
+    async def insert_one(self, document, **kwargs):
+        return await self.collection.insert_one(self._stamp(document), **kwargs)
+
+    async def insert_many(self, documents, **kwargs):
+        return await self.collection.insert_many([self._stamp(document) for document in documents], **kwargs)
+
+    async def update_one(self, filter, update, **kwargs):
+        return await self.collection.update_one(self._scope(filter), update, **kwargs)
+
+    async def update_many(self, filter, update, **kwargs):
+        return await self.collection.update_many(self._scope(filter), update, **kwargs)
+
+    async def delete_one(self, filter, **kwargs):
+        return await self.collection.delete_one(self._scope(filter), **kwargs)
+
+    async def delete_many(self, filter, **kwargs):
+        return await self.collection.delete_many(self._scope(filter), **kwargs)
+
+    async def find_one_and_update(self, filter, update, **kwargs):
+        return await self.collection.find_one_and_update(self._scope(filter), update, **kwargs)
+
+    async def count_documents(self, filter, **kwargs):
+        return await self.collection.count_documents(self._scope(filter), **kwargs)
+
+    async def aggregate(self, pipeline, **kwargs):
+        # Folded into a leading $match so the guild_id index prefix is used
+        if pipeline and '$match' in pipeline[0]:
+            pipeline = [{'$match': self._scope(pipeline[0]['$match'])}, *pipeline[1:]]
+        else:
+            pipeline = [{'$match': {'guild_id': self.guild_id}}, *pipeline]
+        return await self.collection.aggregate(pipeline, **kwargs)
+
+    async def explain(self, filter=None, *args, **kwargs):
+        return await self.collection.explain(self._scope(filter), *args, **kwargs)
@@ -0,0 +1,145 @@
+import asyncio
+import bisect
+import heapq
+from collections import Counter, defaultdict
+
+MAX_CHOICES = 25
+
+
+def _grams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+# In-memory substring index over one guild's event titles. Titles are kept in a
+# case-insensitively sorted list for prefix lookups, and every 1-, 2- and 3-gram
+# of the lowercased title points at the titles containing it, so substring
+# lookups only verify titles sharing the query's rarest grams.
+class TitleIndex:
+    def __init__(self):
+        self.counts = Counter()
+        self.ordered = []
+        self.postings = defaultdict(set)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add(self, title):
+        self.counts[title] += 1
+        if self.counts[title] > 1:
+            return
+        lowered = title.lower()
+        bisect.insort(self.ordered, (lowered, title))
+        for n in (1, 2, 3):
+            for gram in _grams(lowered, n):
+                self.postings[gram].add(title)
+
+    def remove(self, title):
+        if title not in self.counts:
+            return
+        self.counts[title] -= 1
+        if self.counts[title] > 0:
+            return
+        del self.counts[title]
+        lowered = title.lower()
+        del self.ordered[bisect.bisect_left(self.ordered, (lowered, title))]
+        for n in (1, 2, 3):
+            for gram in _grams(lowered, n):
+                titles = self.postings[gram]
+                titles.discard(title)
+                if not titles:
+                    del self.postings[gram]
+
+    def rename(self, old_title, new_title):
+        if old_title != new_title:
+            self.remove(old_title)
+            self.add(new_title)
+
+    def search(self, current, limit=MAX_CHOICES):
+        query = current.lower()
+        # Prefix matches come first, in order
+        results = []
+        position = bisect.bisect_left(self.ordered, (query,))
+        while position < len(self.ordered) and len(results) < limit:
+            lowered, title = self.ordered[position]
+            if not lowered.startswith(query):
+                break
+            results.append(title)
+            position += 1
+        if len(results) == limit or not query:
+            return results
+
+        grams = _grams(query, min(3, len(query)))
+        posting_lists = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+        candidates = posting_lists[0]
+        for titles in posting_lists[1:]:
+            candidates = candidates & titles
+            if not candidates:
+                return results
+
+        needed = limit - len(results)
+        if len(candidates) ** 2 > limit * len(self.ordered):
+            # Dense matches: walking the sorted list finds enough of them sooner
+            # than sorting every candidate would
+            for lowered, title in self.ordered:
+                if query in lowered and not lowered.startswith(query):
+                    results.append(title)
+                    if len(results) == limit:
+                        break
+            return results
+        matches = (
+            (lowered, title) for lowered, title in ((title.lower(), title) for title in candidates)
+            if query in lowered and not lowered.startswith(query)
+        )
+        return results + [title for _, title in heapq.nsmallest(needed, matches)]
+
+
+# Lazily builds one TitleIndex per guild from a single projected query, then
+# keeps it current from the create/edit/delete paths.
+class TitleIndexRegistry:
+    def __init__(self):
+        self.indexes = {}
+        self.loading = {}
+        self.raced = set()
+
+    async def get(self, guild_id, db):
+        if guild_id in self.indexes:
+            return self.indexes[guild_id]
+        if guild_id not in self.loading:
+            self.loading[guild_id] = asyncio.ensure_future(self._load(guild_id, db))
+        return await asyncio.shield(self.loading[guild_id])
+
+    async def _load(self, guild_id, db):
+        self.raced.discard(guild_id)
+        try:
+            events = await db['events'].find({}, {'title': 1, '_id': 0})
+            index = TitleIndex()
+            for event in events:
+                if event.get('title'):
+                    index.add(event['title'])
+            # A write that raced with the snapshot may or may not be in it, so the
+            # result is only used for this lookup and the next one reloads.
+            if guild_id not in self.raced:
+                self.indexes[guild_id] = index
+            return index
+        finally:
+            self.raced.discard(guild_id)
+            del self.loading[guild_id]
+
+    def _apply(self, guild_id, operation, *args):
+        if guild_id in self.loading:
+            self.raced.add(guild_id)
+        index = self.indexes.get(guild_id)
+        if index is not None:
+            getattr(index, operation)(*args)
+
+    def add(self, guild_id, title):
+        self._apply(guild_id, 'add', title)
+
+    def remove(self, guild_id, title):
+        self._apply(guild_id, 'remove', title)
+
+    def rename(self, guild_id, old_title, new_title):
+        self._apply(guild_id, 'rename', old_title, new_title)
+
+    def drop(self, guild_id):
+        self.indexes.pop(guild_id, None)
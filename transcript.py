@@ -0,0 +1,83 @@
+import asyncio
+
+MAX_MESSAGE_CHARS = 2000
+_STOP = object()
+
+
+# Coalesces transcript lines per channel into as few Discord messages as
+# possible. Callers only enqueue; a single background task does the sending,
+# so log lines never hold up the interaction response. The queue is bounded:
+# when Discord rate limits slow the sender down, callers wait instead of
+# buffering without limit.
+class TranscriptLogger:
+    def __init__(self, send, max_queue=1000, flush_interval=2.0, max_chars=MAX_MESSAGE_CHARS):
+        self.send = send
+        self.flush_interval = flush_interval
+        self.max_chars = max_chars
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.buffers = {}
+        self.sizes = {}
+        self.deadlines = {}
+        self.task = None
+        self.lines = 0
+        self.messages = 0
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def log(self, channel_id, line):
+        await self.queue.put((channel_id, line[:self.max_chars]))
+
+    async def close(self, timeout=10.0):
+        if self.task is None:
+            return
+        await self.queue.put(_STOP)
+        try:
+            await asyncio.wait_for(self.task, timeout)
+        except asyncio.TimeoutError:
+            print(f'Transcript logger did not drain within {timeout}s')
+        self.task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            timeout = max(0.0, min(self.deadlines.values()) - loop.time()) if self.deadlines else None
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                item = None
+            if item is _STOP:
+                break
+            if item is not None:
+                await self._append(*item)
+            now = loop.time()
+            for channel_id in [channel_id for channel_id, deadline in self.deadlines.items() if deadline <= now]:
+                await self._flush(channel_id)
+        for channel_id in list(self.buffers):
+            await self._flush(channel_id)
+
+    async def _append(self, channel_id, line):
+        buffer = self.buffers.get(channel_id)
+        if buffer and self.sizes[channel_id] + 1 + len(line) > self.max_chars:
+            await self._flush(channel_id)
+            buffer = None
+        if not buffer:
+            buffer = self.buffers[channel_id] = []
+            self.sizes[channel_id] = -1
+            self.deadlines[channel_id] = asyncio.get_running_loop().time() + self.flush_interval
+        buffer.append(line)
+        self.sizes[channel_id] += 1 + len(line)
+        self.lines += 1
+
+    async def _flush(self, channel_id):
+        buffer = self.buffers.pop(channel_id, None)
+        self.sizes.pop(channel_id, None)
+        self.deadlines.pop(channel_id, None)
+        if not buffer:
+            return
+        try:
+            await self.send(channel_id, "\n".join(buffer))
+            self.messages += 1
+        except Exception as e:
+            print(f'Error sending transcript to {channel_id}: {e}')